@@ -0,0 +1,87 @@
+import os
+from PyQt6.QtGui import QUndoCommand
+
+COMMENT_COMMAND_ID = 1  # Lets consecutive edits of one comment merge into a single undo step
+
+
+class AnnotationStore:
+    """
+    Sparse, path-keyed store of item comments.
+
+    Only items that actually have a comment take up an entry.
+    """
+
+    def __init__(self):
+        self._comments = {}
+
+    def __len__(self):
+        return len(self._comments)
+
+    def get(self, path):
+        """Return the comment for a path, or an empty string."""
+        return self._comments.get(path, "")
+
+    def set(self, path, comment):
+        """Set the comment for a path; an empty comment removes the entry."""
+        if comment:
+            self._comments[path] = comment
+        else:
+            self._comments.pop(path, None)
+
+    def discard_under(self, path):
+        """Remove the comments of a path and everything below it."""
+        prefix = os.path.join(path, '')
+        for key in [k for k in self._comments if k == path or k.startswith(prefix)]:
+            del self._comments[key]
+
+
+class CommentCommand(QUndoCommand):
+    """Undoable change of one item's comment, recorded as old and new text."""
+
+    def __init__(self, tree_view, path, old_comment, new_comment):
+        super().__init__(f"Edit comment on {path}")
+        self.tree_view = tree_view
+        self.path = path
+        self.old_comment = old_comment
+        self.new_comment = new_comment
+
+    def id(self):
+        return COMMENT_COMMAND_ID
+
+    def mergeWith(self, other):
+        if other.path != self.path:
+            return False
+        self.new_comment = other.new_comment
+        # Typing a comment back to what it was leaves nothing to undo
+        self.setObsolete(self.new_comment == self.old_comment)
+        return True
+
+    def redo(self):
+        self.tree_view.apply_comment(self.path, self.new_comment)
+
+    def undo(self):
+        self.tree_view.apply_comment(self.path, self.old_comment)
+
+
+class FilterStateCommand(QUndoCommand):
+    """
+    Undoable change of the direct filter state of one or more items.
+
+    Each change is recorded as (path, old state, new state), where a state
+    is 'filter', 'exclude' or 'none', so a batch costs one tuple per item.
+    """
+
+    def __init__(self, tree_view, changes, text):
+        super().__init__(text)
+        self.tree_view = tree_view
+        self.changes = changes
+
+    def redo(self):
+        for path, _, new_state in self.changes:
+            self.tree_view.apply_item_state(path, new_state)
+        self.tree_view.itemStateChanged.emit()
+
+    def undo(self):
+        for path, old_state, _ in reversed(self.changes):
+            self.tree_view.apply_item_state(path, old_state)
+        self.tree_view.itemStateChanged.emit()
@@ -0,0 +1,163 @@
+"""
+Compare the memory held by tree items that store full paths against items
+that store interned names and derive their path from the parent chain, and
+the memory of the index TreeView keeps to find items by path.
+
+Usage: python benchmarks/bench_paths.py [base path]
+
+A synthetic tree of 251,111 nodes (10 x 10 x 10 directories with 250 files
+each) is built under the base path, by default a 57-character one. The items
+are plain-Python stand-ins with the same Python attributes as TreeItem, so
+tracemalloc sees exactly what TreeItem keeps in its __dict__; the C++ side of
+QTreeWidgetItem is the same for all layouts and is not measured. Each named
+layout is measured after reading the path of every item once, as saving,
+diffing or collecting the included files does.
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+DEFAULT_BASE = "/home/someone/projects/some-organisation/large-repository"
+FANOUT = (10, 10, 10)  # Subdirectories per directory, level by level
+FILES_PER_DIRECTORY = 250
+
+
+class FullPathItem:
+    """Item layout before: every node stores its full path."""
+
+    def __init__(self, parent, path):
+        self.parent = parent
+        self.filter_state = 'none'
+        self.path = path
+        self.is_filter_direct = False
+        self.is_exclude_direct = False
+
+
+class NamedItem:
+    """Item layout after: an interned name, with the path derived and memoized like TreeItem.path."""
+
+    has_children = False  # Stands in for QTreeWidgetItem.childCount(), set on directories only
+
+    def __init__(self, parent, name, base_path=None):
+        self.parent = parent
+        self.filter_state = 'none'
+        self.name = sys.intern(name)
+        self.base_path = base_path
+        self._full_path = None
+        self.is_filter_direct = False
+        self.is_exclude_direct = False
+        if parent is not None:
+            parent.has_children = True
+
+    def memoizes(self):
+        return self.has_children
+
+    @property
+    def path(self):
+        if self._full_path is not None:
+            return self._full_path
+        if self.base_path is not None:
+            return self.base_path
+        path = os.path.join(self.parent.path, self.name)
+        if self.memoizes():
+            self._full_path = path
+        return path
+
+
+class MemoizeAllItem(NamedItem):
+    """Named item that memoizes its path even without children, as TreeItem.path did at first."""
+
+    def memoizes(self):
+        return True
+
+
+def index_by_path(items):
+    """A full path -> item dictionary over all items."""
+    return {item.path: item for item in items}
+
+
+def index_by_name(items):
+    """An id(directory) -> {name: child} dictionary, as TreeView.child_index."""
+    child_index = {}
+    for item in items:
+        if item.parent is not None:
+            children = child_index.get(id(item.parent))
+            if children is None:
+                children = child_index[id(item.parent)] = {}
+            children[item.name] = item
+    return child_index
+
+
+def touch_paths(items):
+    """Read the path of every item once."""
+    for item in items:
+        item.path
+
+
+def build(base, make_root, make_child):
+    """Build the synthetic tree and return all of its items."""
+    root = make_root(base)
+    items = [root]
+    level = [root]
+    for fanout in FANOUT:
+        next_level = []
+        for directory in level:
+            for i in range(fanout):
+                child = make_child(directory, f"dir{i:02d}")
+                items.append(child)
+                next_level.append(child)
+        level = next_level
+    for directory in level:
+        for i in range(FILES_PER_DIRECTORY):
+            items.append(make_child(directory, f"module_{i:03d}.py"))
+    return items
+
+
+def measure(func):
+    """Return the memory still allocated by func's result, and the result."""
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, result
+
+
+def named(base, item_class, index=None):
+    """Build the tree of named items, read every path, and build the index if any."""
+    items = build(
+        base,
+        lambda path: item_class(None, os.path.basename(path), path),
+        lambda parent, name: item_class(parent, name))
+    touch_paths(items)
+    return items, index(items) if index is not None else None
+
+
+def main():
+    base = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_BASE
+
+    layouts = [
+        ("full paths", lambda: build(
+            base,
+            lambda path: FullPathItem(None, path),
+            lambda parent, name: FullPathItem(parent, os.path.join(parent.path, name)))),
+        ("full paths + path index", lambda: index_by_path(build(
+            base,
+            lambda path: FullPathItem(None, path),
+            lambda parent, name: FullPathItem(parent, os.path.join(parent.path, name))))),
+        ("names, memo on every item", lambda: named(base, MemoizeAllItem)),
+        ("names, memo on directories", lambda: named(base, NamedItem)),
+        ("names, memo on every item + path index", lambda: named(base, MemoizeAllItem, index_by_path)),
+        ("names, memo on directories + name index", lambda: named(base, NamedItem, index_by_name)),
+    ]
+    print(f"base path: {base} ({len(base)} characters)")
+    for name, func in layouts:
+        size, result = measure(func)
+        print(f"{name:<42} {size / 1024 / 1024:8.1f} MB")
+        del result
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Compare loading a repository by walking the disk against reading its git index.
+
+Usage: python benchmarks/bench_scan.py /path/to/repository [repeats] [summary threshold]
+
+Each source is timed through scanner.scan_directory, as the scan workers run
+it, up to the point where TreeView would create items. The summary threshold
+defaults to the application's; 0 turns summaries off.
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scanner import scan_directory, DirectorySummary, SCAN_SOURCES, SUMMARY_THRESHOLD
+
+
+def count_nodes(nodes):
+    if isinstance(nodes, DirectorySummary):
+        nodes = nodes.nodes
+    return sum(1 + (count_nodes(children) if children is not None else 0) for _, _, _, children in nodes)
+
+
+def best_of(repeats, func):
+    best = None
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    path = Path(sys.argv[1]).resolve()
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    summary_threshold = int(sys.argv[3]) if len(sys.argv) > 3 else SUMMARY_THRESHOLD
+
+    for source in SCAN_SOURCES:
+        elapsed, nodes = best_of(repeats, lambda: scan_directory(path, source, summary_threshold))
+        print(f"{source:<14} {elapsed * 1000:9.1f} ms  {count_nodes(nodes):>9} nodes")
+
+
+if __name__ == '__main__':
+    main()
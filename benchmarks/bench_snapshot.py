@@ -0,0 +1,114 @@
+"""
+Compare saving and loading a tree as indent=2 JSON against a binary snapshot.
+
+Usage: python benchmarks/bench_snapshot.py /path/to/directory [repeats]
+
+The directory is scanned once and converted to the nodes that
+TreeView.build_tree_json produces. Loading is timed up to the point where
+TreeView would create items: reading every node's name, type, state and
+parent, from the parsed JSON dictionaries or from the snapshot's arrays.
+"""
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scanner import scan_directory
+from snapshot import Snapshot, write_snapshot
+
+
+def to_tree_json(text, type_, name, children):
+    node = {
+        "name": text,
+        "type": type_.lower(),
+        "filter_state": "none",
+        "is_filter_direct": False,
+        "is_exclude_direct": False
+    }
+    if not name:
+        node["path"] = ""
+    if children:
+        node["contents"] = [to_tree_json(*child) for child in children]
+    return node
+
+
+def best_of(repeats, func):
+    best = None
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def save_json(tree_file, tree_json):
+    with open(tree_file, 'w', encoding='utf-8') as f:
+        json.dump(tree_json, f, indent=2)
+
+
+def load_json(tree_file):
+    with open(tree_file, 'r', encoding='utf-8') as f:
+        tree_data = json.load(f)
+    count = 0
+    stack = [tree_data['root']]
+    while stack:
+        node = stack.pop()
+        node.get('name', '')
+        node.get('type', '')
+        node.get('filter_state', 'none')
+        node.get('is_filter_direct', False)
+        node.get('is_exclude_direct', False)
+        node.get('comment', '')
+        count += 1
+        stack.extend(node.get('contents', []))
+    return count
+
+
+def load_snapshot(snapshot_file):
+    with Snapshot(snapshot_file) as snapshot:
+        names = snapshot.names
+        name_indices = snapshot.name_indices
+        parents = snapshot.parents
+        flags = snapshot.flags
+        for index in range(snapshot.node_count):
+            names[name_indices[index]]
+            parents[index]
+            flags[index]
+            index in snapshot.comments
+        return snapshot.node_count
+
+
+def main():
+    path = Path(sys.argv[1]).resolve()
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    root_json = to_tree_json(path.name, "Directory", path.name, scan_directory(path))
+    root_json["path"] = str(path)
+    tree_json = {"title": "benchmark", "path": str(path), "root": root_json}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_file = Path(tmp) / "tree.json"
+        snapshot_file = Path(tmp) / "tree.snap"
+        formats = [
+            ("json", json_file,
+             lambda: save_json(json_file, tree_json),
+             lambda: load_json(json_file)),
+            ("snapshot", snapshot_file,
+             lambda: write_snapshot(snapshot_file, "benchmark", [str(path)], [root_json]),
+             lambda: load_snapshot(snapshot_file)),
+        ]
+        for name, tree_file, save, load in formats:
+            save_time, _ = best_of(repeats, save)
+            load_time, nodes = best_of(repeats, load)
+            size = tree_file.stat().st_size
+            print(f"{name:<9} save {save_time * 1000:8.1f} ms  load {load_time * 1000:8.1f} ms  "
+                  f"{size / 1024 / 1024:8.2f} MB  {nodes:>9} nodes")
+
+
+if __name__ == '__main__':
+    main()
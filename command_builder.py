@@ -1,26 +1,36 @@
 from PyQt6.QtWidgets import QLineEdit
+from utils import common_parent
 
 class CommandBuilder(QLineEdit):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setReadOnly(True)
         self.setPlaceholderText("code2prompt command will appear here...")
-        self.current_directory = ""
+        self.per_root = False  # One command per root instead of a combined command
+        self.commands = []  # Argument lists of the current commands, without the program name
 
-    def update_command(self, root_item):
+    def clear(self):
+        """Clear the displayed command and its arguments."""
+        self.commands = []
+        super().clear()
+
+    def collect_paths(self, root_item):
         """
-        Update the command based on the current tree state.
-        
+        Collect the paths of directly filtered and excluded items below a root.
+
         Args:
-            root_item (TreeItem): The root item of the directory tree.
+            root_item (TreeItem): The root item of a directory tree.
+
+        Returns:
+            tuple: (filters, excludes) lists of paths.
         """
         filters = []
         excludes = []
 
-        def collect_paths(item):
+        def collect(item):
             """
             Recursively collect paths for filters and excludes.
-            
+
             Args:
                 item (TreeItem): The current tree item.
             """
@@ -33,16 +43,55 @@ class CommandBuilder(QLineEdit):
             # Traverse children to find direct excludes/filters
             for i in range(item.childCount()):
                 child = item.child(i)
-                collect_paths(child)
+                collect(child)
 
-        collect_paths(root_item)
+        collect(root_item)
+        return filters, excludes
 
-        command = f'code2prompt --path "{self.current_directory}"'
+    def update_command(self, root_items):
+        """
+        Update the command based on the current tree state.
+
+        Args:
+            root_items (list): The root items of the workspace, one per directory.
+        """
+        roots = [(item.path, *self.collect_paths(item)) for item in root_items]
+        if not roots:
+            self.clear()
+            return
+
+        # Roots without a common parent below a filesystem root get one command each
+        path = None
+        if not (self.per_root or len(roots) == 1):
+            path = common_parent([root_path for root_path, _, _ in roots])
+        if path is not None:
+            # A single command over the common parent, filtered down to the roots.
+            # Roots without filters of their own are included as a whole.
+            filters = []
+            excludes = []
+            for root_path, root_filters, root_excludes in roots:
+                filters.extend(root_filters or [root_path])
+                excludes.extend(root_excludes)
+            roots = [(path, filters, excludes)]
+
+        self.commands = [self._build_arguments(*root) for root in roots]
+        self.setText(' && '.join(self._format_command(*root) for root in roots))
+
+    def _build_arguments(self, path, filters, excludes):
+        arguments = ['--path', path]
+        if excludes:
+            arguments += ['--exclude', ','.join(excludes)]
+        if filters:
+            arguments += ['--filter', ','.join(filters)]
+        return arguments
+
+    def _format_command(self, path, filters, excludes):
+        """Format a command as the quoted command line shown to the user."""
+        command = f'code2prompt --path "{path}"'
         if excludes:
             excludes_str = ','.join(f'"{p}"' for p in excludes)
             command += f' --exclude {excludes_str}'
         if filters:
             filters_str = ','.join(f'"{p}"' for p in filters)
             command += f' --filter {filters_str}'
-
-        self.setText(command)
+        return command
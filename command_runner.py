@@ -0,0 +1,172 @@
+import hashlib
+import os
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPlainTextEdit, QPushButton
+from PyQt6.QtCore import Qt, QProcess, QThreadPool
+from PyQt6.QtGui import QFontDatabase, QTextCursor
+from workers import FunctionWorker
+
+PROGRAM = 'code2prompt'
+
+
+def fingerprint_files(paths, directories=()):
+    """
+    Fingerprint a set of files by path, modification time and size.
+
+    Missing files are included as such, so deleting a file changes the fingerprint.
+    code2prompt walks the included directories itself, so their modification
+    times are included too: adding, removing or renaming an entry in one
+    changes the fingerprint even if the tree does not list that entry yet.
+
+    Args:
+        paths (list): The included files.
+        directories (list): The included directories.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for path in sorted(paths):
+        try:
+            st = os.stat(path)
+            h.update(f"{path}\0{st.st_mtime_ns}\0{st.st_size}\n".encode('utf-8', errors='surrogateescape'))
+        except OSError:
+            h.update(f"{path}\0missing\n".encode('utf-8', errors='surrogateescape'))
+    for path in sorted(set(directories)):
+        try:
+            st = os.stat(path)
+            h.update(f"{path}/\0{st.st_mtime_ns}\n".encode('utf-8', errors='surrogateescape'))
+        except OSError:
+            h.update(f"{path}/\0missing\n".encode('utf-8', errors='surrogateescape'))
+    return h.hexdigest()
+
+
+class RunDialog(QDialog):
+    """
+    Run code2prompt in the background and stream its output.
+
+    Several commands (one per workspace root) run one after another. Output
+    of successful runs is stored in a cache keyed by the command arguments
+    and a fingerprint of the included files and directories, so an identical
+    run is answered from the cache.
+    """
+
+    def __init__(self, commands, included_paths, included_directories, cache, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Run code2prompt")
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.resize(900, 600)
+        self.commands = [list(arguments) for arguments in commands]
+        self.command_index = 0
+        self.cache = cache
+        self.cache_key = tuple(tuple(arguments) for arguments in self.commands)
+        self.fingerprint = None
+        self.process = None
+        self.output_chunks = []
+        self.cancelled = False
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        self.status_label = QLabel("Checking included files...")
+        layout.addWidget(self.status_label)
+
+        self.output_edit = QPlainTextEdit()
+        self.output_edit.setReadOnly(True)
+        self.output_edit.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        layout.addWidget(self.output_edit)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel)
+        button_layout.addWidget(self.cancel_button)
+        self.close_button = QPushButton("Close")
+        self.close_button.clicked.connect(self.close)
+        button_layout.addWidget(self.close_button)
+        layout.addLayout(button_layout)
+
+        # Stat the included files off the UI thread before deciding whether to run
+        worker = FunctionWorker(fingerprint_files, included_paths, included_directories)
+        worker.signals.finished.connect(self.on_fingerprint_ready)
+        worker.signals.error.connect(self.on_fingerprint_failed)
+        QThreadPool.globalInstance().start(worker)
+
+    def on_fingerprint_ready(self, fingerprint):
+        if self.cancelled:
+            return
+        self.fingerprint = fingerprint
+        cached = self.cache.get(self.cache_key, fingerprint)
+        if cached is not None:
+            self.output_edit.setPlainText(cached)
+            self.status_label.setText("Finished (cached result, no files changed since the last run)")
+            self.cancel_button.setEnabled(False)
+            return
+        self.start_process()
+
+    def on_fingerprint_failed(self, message):
+        # Without a fingerprint the result cannot be cached, but the command can still run
+        if not self.cancelled:
+            self.start_process()
+
+    def start_process(self):
+        self.process = QProcess(self)
+        self.process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
+        self.process.readyReadStandardOutput.connect(self.on_output_ready)
+        self.process.finished.connect(self.on_process_finished)
+        self.process.errorOccurred.connect(self.on_process_error)
+        arguments = self.commands[self.command_index]
+        if len(self.commands) > 1:
+            self.status_label.setText(f"Running {PROGRAM} ({self.command_index + 1}/{len(self.commands)})...")
+            self.append_output(f"=== {PROGRAM} --path {arguments[1]} ===\n")
+        else:
+            self.status_label.setText(f"Running {PROGRAM}...")
+        self.process.start(PROGRAM, arguments)
+
+    def on_output_ready(self):
+        text = bytes(self.process.readAllStandardOutput()).decode('utf-8', errors='replace')
+        if text:
+            self.append_output(text)
+
+    def append_output(self, text):
+        self.output_chunks.append(text)
+        cursor = self.output_edit.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+
+    def on_process_finished(self, exit_code, exit_status):
+        self.on_output_ready()
+        if self.cancelled:
+            self.status_label.setText("Cancelled")
+        elif exit_status != QProcess.ExitStatus.NormalExit or exit_code != 0:
+            self.status_label.setText(f"{PROGRAM} exited with code {exit_code}")
+        elif self.command_index + 1 < len(self.commands):
+            self.command_index += 1
+            self.append_output("\n")
+            self.start_process()
+            return
+        else:
+            self.status_label.setText("Finished")
+            if self.fingerprint is not None:
+                output = ''.join(self.output_chunks)
+                self.cache.put(self.cache_key, output, len(output), self.fingerprint)
+        self.cancel_button.setEnabled(False)
+
+    def on_process_error(self, error):
+        if error == QProcess.ProcessError.FailedToStart:
+            self.cancel_button.setEnabled(False)
+            self.status_label.setText(f"Could not start {PROGRAM}. Is it installed and on the PATH?")
+
+    def cancel(self):
+        """Stop the run; the partial output is kept on screen but not cached."""
+        self.cancelled = True
+        self.cancel_button.setEnabled(False)
+        if self.process is not None and self.process.state() != QProcess.ProcessState.NotRunning:
+            self.process.kill()
+        else:
+            self.status_label.setText("Cancelled")
+
+    def closeEvent(self, event):
+        if self.process is not None and self.process.state() != QProcess.ProcessState.NotRunning:
+            self.cancel()
+            self.process.waitForFinished(1000)
+        else:
+            # Keeps a pending fingerprint from starting the process
+            self.cancelled = True
+        event.accept()
@@ -2,6 +2,7 @@ import json
 from pathlib import Path
 from PyQt6.QtWidgets import QMessageBox
 from utils import make_safe_filename
+from snapshot import SNAPSHOT_SUFFIX, Snapshot, read_snapshot_title, write_snapshot
 
 
 class DataManager:
@@ -12,10 +13,11 @@ class DataManager:
             self.trees_dir.mkdir()
         self.tree_titles = []
         self.title_to_file = {}
+        self.save_snapshot = False  # Save trees as binary snapshots instead of JSON
         self.load_trees_data()
 
     def load_trees_data(self):
-        """Load trees data from individual JSON files in the 'trees' directory."""
+        """Load tree titles from the JSON files and binary snapshots in the 'trees' directory."""
         self.tree_titles = []
         self.title_to_file = {}
         for tree_file in self.trees_dir.glob('*.json'):
@@ -28,37 +30,101 @@ class DataManager:
             except json.JSONDecodeError:
                 QMessageBox.critical(self.parent, "Error", f"Failed to decode {tree_file.name}. The file might be corrupted.")
                 continue
+        for tree_file in self.trees_dir.glob(f'*{SNAPSHOT_SUFFIX}'):
+            # Only the header is read, not the nodes
+            try:
+                title = read_snapshot_title(tree_file)
+            except (OSError, ValueError, KeyError):
+                QMessageBox.critical(self.parent, "Error", f"Failed to read {tree_file.name}. The file might be corrupted.")
+                continue
+            if title not in self.title_to_file:
+                self.tree_titles.append(title)
+            self.title_to_file[title] = tree_file
 
-    def save_tree(self, title, path, root_json):
+    def is_snapshot(self, title):
+        """Return True if a saved tree is stored as a binary snapshot."""
+        tree_file = self.title_to_file.get(title)
+        return tree_file is not None and tree_file.suffix == SNAPSHOT_SUFFIX
+
+    def load_tree(self, title):
         """
-        Save the tree data to a JSON file.
-        
+        Read a saved tree.
+
+        Returns the parsed JSON data, or an open Snapshot for trees saved as
+        binary snapshots, which the caller must close. Raises an exception if
+        the file cannot be read.
+        """
+        tree_file = self.title_to_file[title]
+        if tree_file.suffix == SNAPSHOT_SUFFIX:
+            return Snapshot(tree_file)
+        with open(tree_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def load_tree_json(self, title):
+        """Read a saved tree as JSON data, whatever format it is stored in."""
+        tree_data = self.load_tree(title)
+        if isinstance(tree_data, Snapshot):
+            with tree_data:
+                return tree_data.to_tree_json()
+        return tree_data
+
+    def save_tree(self, title, paths, roots_json):
+        """
+        Save the tree data to a JSON file, or a binary snapshot if save_snapshot is set.
+
+        A single root is saved under "path" and "root"; a workspace with
+        several roots is saved under "paths" and "roots". A file of the
+        other format saved under the same title is removed.
+
         Returns True on success, False otherwise.
         """
         safe_title = make_safe_filename(title)
-        tree_file = self.trees_dir / f"{safe_title}.json"
+        suffix = SNAPSHOT_SUFFIX if self.save_snapshot else '.json'
+        tree_file = self.trees_dir / f"{safe_title}{suffix}"
+        old_file = self.title_to_file.get(title)
+
+        if self.save_snapshot:
+            try:
+                write_snapshot(tree_file, title, paths, roots_json)
+            except Exception as e:
+                QMessageBox.critical(self.parent, "Error", f"Failed to save tree '{title}':\n{str(e)}")
+                return False
+            self._saved(title, tree_file, old_file)
+            return True
 
-        tree_json = {
-            "title": title,
-            "path": path,
-            "root": root_json
-        }
+        if len(roots_json) == 1:
+            tree_json = {
+                "title": title,
+                "path": paths[0],
+                "root": roots_json[0]
+            }
+        else:
+            tree_json = {
+                "title": title,
+                "paths": paths,
+                "roots": roots_json
+            }
 
         try:
             with open(tree_file, 'w', encoding='utf-8') as f:
                 json.dump(tree_json, f, indent=2)
-            # Update internal mappings
-            if title not in self.tree_titles:
-                self.tree_titles.append(title)
-                self.title_to_file[title] = tree_file
+            self._saved(title, tree_file, old_file)
             return True
         except Exception as e:
             QMessageBox.critical(self.parent, "Error", f"Failed to save tree '{title}':\n{str(e)}")
             return False
 
+    def _saved(self, title, tree_file, old_file):
+        """Update internal mappings after saving, dropping the file of the previous format."""
+        if old_file is not None and old_file != tree_file:
+            old_file.unlink(missing_ok=True)
+        if title not in self.tree_titles:
+            self.tree_titles.append(title)
+        self.title_to_file[title] = tree_file
+
     def rename_tree(self, old_title, new_title):
         """
-        Rename an existing tree by creating a new JSON file and deleting the old one.
+        Rename an existing tree by renaming its file, keeping its format.
         
         Returns True on success, False otherwise.
         """
@@ -72,12 +138,15 @@ class DataManager:
             if proceed != QMessageBox.StandardButton.Yes:
                 return False
 
-        old_safe_title = make_safe_filename(old_title)
         new_safe_title = make_safe_filename(new_title)
-        old_file = self.trees_dir / f"{old_safe_title}.json"
-        new_file = self.trees_dir / f"{new_safe_title}.json"
+        old_file = self.title_to_file.get(old_title, self.trees_dir / f"{make_safe_filename(old_title)}.json")
+        new_file = self.trees_dir / f"{new_safe_title}{old_file.suffix}"
 
         try:
+            overwritten = self.title_to_file.pop(new_title, None)
+            if overwritten is not None:
+                overwritten.unlink(missing_ok=True)
+                self.tree_titles.remove(new_title)
             if new_file.exists():
                 new_file.unlink()
             old_file.rename(new_file)
@@ -93,7 +162,7 @@ class DataManager:
 
     def delete_tree(self, title):
         """
-        Delete a tree's JSON file.
+        Delete a tree's file.
         
         Returns True on success, False otherwise.
         """
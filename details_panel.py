@@ -1,6 +1,18 @@
-from PyQt6.QtWidgets import QWidget, QLabel, QTextEdit, QVBoxLayout
+from PyQt6.QtWidgets import (
+    QWidget, QLabel, QTextEdit, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QPushButton
+)
+from PyQt6.QtCore import QThreadPool, QTimer, pyqtSignal
+from PyQt6.QtGui import QFontDatabase
+from file_preview import open_preview
+from workers import FunctionWorker
+
+PREVIEW_PAGE_LINES = 200
+COMMENT_DEBOUNCE_MS = 400  # Pause in typing before an edited comment is stored
+
 
 class DetailsPanel(QWidget):
+    commentEdited = pyqtSignal(str, str)  # (path, comment), emitted once typing pauses
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.layout = QVBoxLayout()
@@ -9,27 +21,201 @@ class DetailsPanel(QWidget):
         self.name_label = QLabel("")
         self.layout.addWidget(self.name_label)
 
+        # Contents of a directory shown as a summary
+        self.summary_label = QLabel("")
+        self.summary_label.setVisible(False)
+        self.layout.addWidget(self.summary_label)
+
         self.comment_edit = QTextEdit()
         self.comment_edit.setFontFamily("monospace")
         self.comment_edit.setPlaceholderText("Enter comment here...")
         self.comment_edit.textChanged.connect(self.on_comment_changed)
         self.layout.addWidget(self.comment_edit)
 
+        self.comment_timer = QTimer(self)
+        self.comment_timer.setSingleShot(True)
+        self.comment_timer.setInterval(COMMENT_DEBOUNCE_MS)
+        self.comment_timer.timeout.connect(self.emit_comment)
+
+        # Read-only preview of the selected file, one page of lines at a time
+        self.preview_label = QLabel("")
+        self.layout.addWidget(self.preview_label)
+
+        self.preview_edit = QPlainTextEdit()
+        self.preview_edit.setReadOnly(True)
+        self.preview_edit.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.preview_edit.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        self.layout.addWidget(self.preview_edit)
+
+        preview_nav_layout = QHBoxLayout()
+        self.prev_page_button = QPushButton("Previous Page")
+        self.prev_page_button.clicked.connect(self.show_previous_page)
+        self.next_page_button = QPushButton("Next Page")
+        self.next_page_button.clicked.connect(self.show_next_page)
+        preview_nav_layout.addWidget(self.prev_page_button)
+        preview_nav_layout.addStretch()
+        preview_nav_layout.addWidget(self.next_page_button)
+        self.layout.addLayout(preview_nav_layout)
+
+        # A single worker so a burst of selections runs at most one stale load
+        self.preview_pool = QThreadPool(self)
+        self.preview_pool.setMaxThreadCount(1)
+        self.preview = None
+        self.preview_first_line = 0
+        self._preview_generation = 0
+
         self.current_item = None
+        self.set_preview_visible(False)
         self.setEnabled(False)
 
-    def update_details(self, item):
+    def update_details(self, item, comment, summary=None):
+        """
+        Show an item and its comment.
+
+        Args:
+            item (TreeItem): The selected item.
+            comment (str): The item's comment from the annotation store.
+            summary (DirectorySummary): The item's summary, if it is a summarized directory.
+        """
+        self.flush_comment()
         self.current_item = item
         self.name_label.setText(f"{item.text(1)} Name: {item.text(0)}")
-        self.comment_edit.setPlainText(item.comment)
+        self.summary_label.setText(summary.describe() if summary is not None else "")
+        self.summary_label.setVisible(summary is not None)
+        self.set_comment_text(comment)
+        # Comments are keyed by path, so placeholders cannot have one
+        self.comment_edit.setEnabled(bool(item.path))
         self.setEnabled(True)
+        if item.text(1).lower() == "file" and item.path:
+            self.load_preview(item.path)
+        else:
+            self.close_preview()
+            self.set_preview_visible(False)
 
     def clear_details(self):
+        self.flush_comment()
         self.current_item = None
         self.name_label.setText("")
-        self.comment_edit.clear()
+        self.summary_label.setText("")
+        self.summary_label.setVisible(False)
+        self.set_comment_text("")
+        self.close_preview()
+        self.set_preview_visible(False)
         self.setEnabled(False)
 
     def on_comment_changed(self):
         if self.current_item:
-            self.current_item.comment = self.comment_edit.toPlainText()
+            self.comment_timer.start()
+
+    def flush_comment(self):
+        """Emit a comment edit that is still waiting for typing to pause."""
+        if self.comment_timer.isActive():
+            self.comment_timer.stop()
+            self.emit_comment()
+
+    def emit_comment(self):
+        if self.current_item and self.current_item.path:
+            self.commentEdited.emit(self.current_item.path, self.comment_edit.toPlainText())
+
+    def show_comment(self, path, comment):
+        """Refresh the comment editor if it shows the item at path, e.g. after an undo."""
+        if self.current_item is None or self.current_item.path != path:
+            return
+        if comment != self.comment_edit.toPlainText():
+            self.comment_timer.stop()
+            self.set_comment_text(comment)
+
+    def set_comment_text(self, comment):
+        """Replace the editor text without treating it as an edit."""
+        self.comment_edit.blockSignals(True)
+        self.comment_edit.setPlainText(comment)
+        self.comment_edit.blockSignals(False)
+
+    def set_preview_visible(self, visible):
+        self.preview_label.setVisible(visible)
+        self.preview_edit.setVisible(visible)
+        self.prev_page_button.setVisible(visible)
+        self.next_page_button.setVisible(visible)
+
+    def close_preview(self):
+        """Close the current preview and invalidate any load still in progress."""
+        self._preview_generation += 1
+        self.preview_pool.clear()  # Drop loads that have not started yet
+        if self.preview is not None:
+            self.preview.close()
+            self.preview = None
+        self.preview_edit.clear()
+        self.preview_label.setText("")
+
+    def load_preview(self, path):
+        """Open a preview of the file in the background."""
+        self.close_preview()
+        self.set_preview_visible(True)
+        self.preview_label.setText("Loading preview...")
+        self.prev_page_button.setEnabled(False)
+        self.next_page_button.setEnabled(False)
+
+        worker = FunctionWorker(self._run_preview_load, self._preview_generation, path)
+        worker.signals.finished.connect(self.on_preview_loaded)
+        self.preview_pool.start(worker)
+
+    def _run_preview_load(self, generation, path):
+        """Worker job: open the preview unless a newer selection made it stale."""
+        try:
+            result = open_preview(path, PREVIEW_PAGE_LINES, lambda: generation != self._preview_generation)
+        except Exception as e:
+            return generation, None, str(e)
+        return generation, result, None
+
+    def on_preview_loaded(self, outcome):
+        generation, result, error = outcome
+        if error is not None:
+            self.on_preview_failed(generation, error)
+            return
+        if result is None:
+            return
+        preview, text = result
+        if generation != self._preview_generation:
+            preview.close()
+            return
+        self.preview = preview
+        self.preview_first_line = 0
+        if preview.is_binary:
+            self.preview_label.setText("Binary file, no preview available")
+            self.preview_edit.setVisible(False)
+            self.prev_page_button.setVisible(False)
+            self.next_page_button.setVisible(False)
+            return
+        self.show_page_text(text)
+
+    def on_preview_failed(self, generation, message):
+        if generation != self._preview_generation:
+            return
+        self.preview_label.setText(f"Preview unavailable: {message}")
+        self.preview_edit.setVisible(False)
+        self.prev_page_button.setVisible(False)
+        self.next_page_button.setVisible(False)
+
+    def show_page_text(self, text):
+        """Render one page of the preview and update the navigation controls."""
+        first = self.preview_first_line
+        self.preview_edit.setPlainText(text)
+        if text or first > 0:
+            last = first + text.count("\n") + 1
+            self.preview_label.setText(f"Preview: lines {first + 1}-{last}")
+        else:
+            self.preview_label.setText("Preview: empty file")
+        self.prev_page_button.setEnabled(first > 0)
+        self.next_page_button.setEnabled(self.preview.has_line(first + PREVIEW_PAGE_LINES))
+
+    def show_next_page(self):
+        if self.preview is None:
+            return
+        self.preview_first_line += PREVIEW_PAGE_LINES
+        self.show_page_text(self.preview.read_lines(self.preview_first_line, PREVIEW_PAGE_LINES))
+
+    def show_previous_page(self):
+        if self.preview is None:
+            return
+        self.preview_first_line = max(0, self.preview_first_line - PREVIEW_PAGE_LINES)
+        self.show_page_text(self.preview.read_lines(self.preview_first_line, PREVIEW_PAGE_LINES))
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+_CHUNK_SIZE = 1024 * 1024
+HEAVY_DIRECTORY_RATIO = 0.5  # Share of duplicated files for a directory to be reported
+MAX_HASH_CACHE_ENTRIES = 200000  # Least recently stored digests are dropped beyond this
+
+
+def hash_file(path):
+    """Return the hex blake2b digest of a file's contents, or None if it cannot be read."""
+    h = hashlib.blake2b(digest_size=20)
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(_CHUNK_SIZE)
+                if not chunk:
+                    break
+                h.update(chunk)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+class HashCache:
+    """
+    Persistent cache of file digests keyed by path, valid while mtime and size match.
+
+    Stored as JSON so it survives between sessions. Entries of files that
+    are gone from an analyzed tree are pruned, and only the most recently
+    stored MAX_HASH_CACHE_ENTRIES are kept.
+    """
+
+    def __init__(self, cache_file):
+        self.cache_file = Path(cache_file)
+        self._entries = {}  # path -> [mtime_ns, size, digest]
+        self._dirty = False
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def get(self, path, mtime_ns, size):
+        entry = self._entries.get(path)
+        if entry is None or entry[0] != mtime_ns or entry[1] != size:
+            return None
+        return entry[2]
+
+    def put(self, path, mtime_ns, size, digest):
+        # Re-inserting keeps the entries ordered from least to most recently stored
+        self._entries.pop(path, None)
+        self._entries[path] = [mtime_ns, size, digest]
+        self._dirty = True
+
+    def prune(self, root, seen):
+        """
+        Drop the entries of files under root that were not seen in this run.
+
+        Args:
+            root (str): The analyzed directory.
+            seen (set): The paths examined in this run.
+        """
+        prefix = os.path.join(root, '')
+        stale = [path for path in self._entries if path.startswith(prefix) and path not in seen]
+        for path in stale:
+            del self._entries[path]
+        if stale:
+            self._dirty = True
+
+    def save(self):
+        """Write the cache to disk if it changed."""
+        if not self._dirty:
+            return
+        excess = len(self._entries) - MAX_HASH_CACHE_ENTRIES
+        if excess > 0:
+            for path in list(self._entries)[:excess]:
+                del self._entries[path]
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_file, self.cache_file)
+        self._dirty = False
+
+
+class DuplicateReport:
+    """Groups of identical files and the directories that contain most of them."""
+
+    def __init__(self, groups, heavy_directories, files_scanned, files_hashed):
+        self.groups = groups  # [(size, [paths])], largest wasted space first
+        self.heavy_directories = heavy_directories  # [(path, duplicate files, total files, duplicate bytes)]
+        self.files_scanned = files_scanned
+        self.files_hashed = files_hashed  # Files hashed in this run, i.e. not found in the cache
+
+    def wasted_bytes(self):
+        """Bytes that would be saved by keeping one copy of each group."""
+        return sum(size * (len(paths) - 1) for size, paths in self.groups)
+
+
+def find_duplicates(roots, paths, cache=None, max_workers=None):
+    """
+    Find files with identical contents.
+
+    Files are grouped by size first; only sizes shared by several files are
+    hashed, in a process pool, skipping files whose digest is cached.
+
+    Args:
+        roots (list): The tree roots; directory statistics stop at these paths.
+        paths (list): File paths to examine.
+        cache (HashCache): Optional persistent digest cache, pruned under the roots and saved on completion.
+        max_workers (int): Process pool size, defaults to the CPU count.
+
+    Returns:
+        DuplicateReport
+    """
+    by_size = {}
+    stats = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if st.st_size == 0:
+            continue
+        stats[path] = st
+        by_size.setdefault(st.st_size, []).append(path)
+
+    digests = {}
+    to_hash = []
+    for size, candidates in by_size.items():
+        if len(candidates) < 2:
+            continue
+        for path in candidates:
+            st = stats[path]
+            digest = cache.get(path, st.st_mtime_ns, st.st_size) if cache is not None else None
+            if digest is None:
+                to_hash.append(path)
+            else:
+                digests[path] = digest
+
+    if to_hash:
+        workers = max_workers or os.cpu_count() or 1
+        chunksize = max(1, len(to_hash) // (4 * workers))
+        # Spawn rather than fork: the caller runs in a thread of a Qt application
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            for path, digest in zip(to_hash, executor.map(hash_file, to_hash, chunksize=chunksize)):
+                if digest is None:
+                    continue
+                digests[path] = digest
+                if cache is not None:
+                    st = stats[path]
+                    cache.put(path, st.st_mtime_ns, st.st_size, digest)
+    if cache is not None:
+        seen = set(paths)
+        for root in roots:
+            cache.prune(root, seen)
+        cache.save()
+
+    by_content = {}
+    for path, digest in digests.items():
+        by_content.setdefault((stats[path].st_size, digest), []).append(path)
+    groups = [(size, sorted(group)) for (size, _), group in by_content.items() if len(group) > 1]
+    groups.sort(key=lambda g: (-g[0] * (len(g[1]) - 1), g[1][0]))
+
+    return DuplicateReport(groups, _heavy_directories(roots, paths, groups), len(paths), len(to_hash))
+
+
+def _heavy_directories(roots, paths, groups):
+    """Rank directories under the roots by the bytes held in duplicated files."""
+    roots = sorted((os.path.normpath(root) for root in roots), key=len, reverse=True)
+
+    def ancestors(path):
+        # Stop at the innermost root containing the path
+        root = next((r for r in roots if path.startswith(os.path.join(r, ''))), None)
+        if root is None:
+            return
+        directory = os.path.dirname(path)
+        while len(directory) > len(root):
+            yield directory
+            directory = os.path.dirname(directory)
+
+    totals = {}
+    for path in paths:
+        for directory in ancestors(path):
+            totals[directory] = totals.get(directory, 0) + 1
+
+    duplicates = {}
+    for size, group in groups:
+        for path in group:
+            for directory in ancestors(path):
+                count, total_bytes = duplicates.get(directory, (0, 0))
+                duplicates[directory] = (count + 1, total_bytes + size)
+
+    heavy = [
+        (directory, count, totals[directory], total_bytes)
+        for directory, (count, total_bytes) in duplicates.items()
+        if count >= 2 and count / totals[directory] >= HEAVY_DIRECTORY_RATIO
+    ]
+    heavy.sort(key=lambda d: (-d[3], d[0]))
+    # Only report the outermost heavy directory of a nested chain
+    reported = []
+    for entry in heavy:
+        if not any(entry[0].startswith(outer + os.sep) for outer, *_ in reported):
+            reported.append(entry)
+    return reported
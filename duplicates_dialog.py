@@ -0,0 +1,93 @@
+from PyQt6.QtWidgets import (
+    QDialog, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTabWidget,
+    QTreeWidget, QTreeWidgetItem
+)
+from PyQt6.QtCore import Qt, pyqtSignal
+from metadata import format_size
+
+
+class DuplicatesDialog(QDialog):
+    """Show duplicate file groups and duplicate-heavy directories, with exclusion shortcuts."""
+    excludeRequested = pyqtSignal(list)  # Paths to exclude from the tree
+
+    def __init__(self, report, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Duplicate Files")
+        self.resize(800, 500)
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        layout.addWidget(QLabel(
+            f"{len(report.groups)} duplicate groups, {format_size(report.wasted_bytes())} in redundant copies "
+            f"({report.files_scanned} files scanned, {report.files_hashed} hashed)"
+        ))
+
+        tabs = QTabWidget()
+        layout.addWidget(tabs)
+
+        # Duplicate groups: one top-level row per group, one child per copy
+        groups_tab = QWidget()
+        groups_tab.setLayout(QVBoxLayout())
+        self.groups_tree = QTreeWidget()
+        self.groups_tree.setHeaderLabels(["Path", "Size"])
+        self.groups_tree.setColumnWidth(0, 600)
+        self.groups_tree.setSelectionMode(QTreeWidget.SelectionMode.ExtendedSelection)
+        for size, paths in report.groups:
+            group_item = QTreeWidgetItem([f"{len(paths)} copies", format_size(size)])
+            for path in paths:
+                copy_item = QTreeWidgetItem([path, format_size(size)])
+                copy_item.setData(0, Qt.ItemDataRole.UserRole, path)
+                group_item.addChild(copy_item)
+            self.groups_tree.addTopLevelItem(group_item)
+        groups_tab.layout().addWidget(self.groups_tree)
+
+        groups_buttons = QHBoxLayout()
+        exclude_selected_button = QPushButton("Exclude Selected")
+        exclude_selected_button.clicked.connect(lambda: self.request_exclude(self.groups_tree))
+        keep_first_button = QPushButton("Exclude All But First Copy")
+        keep_first_button.clicked.connect(self.exclude_all_but_first)
+        groups_buttons.addWidget(exclude_selected_button)
+        groups_buttons.addWidget(keep_first_button)
+        groups_buttons.addStretch()
+        groups_tab.layout().addLayout(groups_buttons)
+        tabs.addTab(groups_tab, "Duplicate Groups")
+
+        # Directories where most files are duplicated elsewhere
+        directories_tab = QWidget()
+        directories_tab.setLayout(QVBoxLayout())
+        self.directories_tree = QTreeWidget()
+        self.directories_tree.setRootIsDecorated(False)
+        self.directories_tree.setHeaderLabels(["Directory", "Duplicated Files", "Duplicated Size"])
+        self.directories_tree.setColumnWidth(0, 500)
+        self.directories_tree.setSelectionMode(QTreeWidget.SelectionMode.ExtendedSelection)
+        for path, count, total, total_bytes in report.heavy_directories:
+            directory_item = QTreeWidgetItem([path, f"{count} / {total}", format_size(total_bytes)])
+            directory_item.setData(0, Qt.ItemDataRole.UserRole, path)
+            self.directories_tree.addTopLevelItem(directory_item)
+        directories_tab.layout().addWidget(self.directories_tree)
+
+        exclude_directory_button = QPushButton("Exclude Selected Directories")
+        exclude_directory_button.clicked.connect(lambda: self.request_exclude(self.directories_tree))
+        directories_tab.layout().addWidget(exclude_directory_button)
+        tabs.addTab(directories_tab, "Duplicate-Heavy Directories")
+
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        layout.addWidget(close_button, alignment=Qt.AlignmentFlag.AlignRight)
+
+    def request_exclude(self, tree):
+        """Request exclusion of the paths selected in one of the lists."""
+        paths = [item.data(0, Qt.ItemDataRole.UserRole) for item in tree.selectedItems()]
+        paths = [p for p in paths if p]
+        if paths:
+            self.excludeRequested.emit(paths)
+
+    def exclude_all_but_first(self):
+        """Request exclusion of every copy except the first of each group."""
+        paths = []
+        for i in range(self.groups_tree.topLevelItemCount()):
+            group_item = self.groups_tree.topLevelItem(i)
+            for j in range(1, group_item.childCount()):
+                paths.append(group_item.child(j).data(0, Qt.ItemDataRole.UserRole))
+        if paths:
+            self.excludeRequested.emit(paths)
@@ -0,0 +1,101 @@
+import mmap
+import os
+from array import array
+from metadata import is_readable_file
+
+BINARY_SNIFF_SIZE = 8192  # Bytes checked for NUL characters
+MAX_LINE_LENGTH = 1000  # Longer lines are truncated when rendered
+
+
+class FilePreview:
+    """
+    Read-only, memory-mapped view of a file rendered one page of lines at a time.
+
+    Line start offsets are indexed lazily, only as far as the pages requested,
+    so opening a multi-GB file costs no more than opening a small one.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if not is_readable_file(os.stat(path)):
+            raise ValueError("not a regular file")
+        self._file = open(path, 'rb')
+        self._map = None
+        try:
+            self.size = self._file.seek(0, 2)
+            if self.size > 0:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        self.is_binary = self._map is not None and self._map.find(b'\0', 0, BINARY_SNIFF_SIZE) != -1
+        self._line_starts = array('Q', [0])
+        self._fully_indexed = self.size == 0
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _index_to(self, line):
+        """Extend the line start index until it covers the given line or the end of file."""
+        starts = self._line_starts
+        while not self._fully_indexed and len(starts) <= line:
+            newline = self._map.find(b'\n', starts[-1])
+            if newline == -1 or newline + 1 >= self.size:
+                self._fully_indexed = True
+            else:
+                starts.append(newline + 1)
+
+    def has_line(self, line):
+        """Return True if the file has at least line + 1 lines."""
+        self._index_to(line)
+        return line < len(self._line_starts) and self.size > 0
+
+    def read_lines(self, first_line, count):
+        """
+        Return up to count lines starting at first_line as a single string.
+
+        Lines longer than MAX_LINE_LENGTH are truncated.
+        """
+        if self._map is None or not self.has_line(first_line):
+            return ""
+        self._index_to(first_line + count)
+        starts = self._line_starts
+        last_line = min(first_line + count, len(starts))
+        lines = []
+        for line in range(first_line, last_line):
+            start = starts[line]
+            end = starts[line + 1] - 1 if line + 1 < len(starts) else self.size
+            if end - start > MAX_LINE_LENGTH:
+                text = self._map[start:start + MAX_LINE_LENGTH].decode('utf-8', errors='replace') + " [...]"
+            else:
+                text = self._map[start:end].decode('utf-8', errors='replace').rstrip('\r\n')
+            lines.append(text)
+        return "\n".join(lines)
+
+
+def open_preview(path, page_lines, is_stale):
+    """
+    Open a FilePreview and render its first page, for use in a worker thread.
+
+    Args:
+        path (str): The file to preview.
+        page_lines (int): Number of lines in a page.
+        is_stale (callable): Returns True once the result is no longer wanted.
+
+    Returns:
+        tuple: (FilePreview, first page text), or None if the load went stale.
+    """
+    if is_stale():
+        return None
+    preview = FilePreview(path)
+    if preview.is_binary:
+        text = ""
+    else:
+        text = preview.read_lines(0, page_lines)
+    if is_stale():
+        preview.close()
+        return None
+    return preview, text
@@ -0,0 +1,179 @@
+import os
+import struct
+import subprocess
+from pathlib import Path
+
+# Entry modes stored in the index
+MODE_DIRECTORY = 0o040000  # Sparse directory entry (sparse-index)
+MODE_GITLINK = 0o160000  # Submodule
+
+_HEADER = struct.Struct('>4sII')
+_ENTRY_FIXED_SIZE = 62  # ctime, mtime, dev, ino, mode, uid, gid, size, sha1, flags
+_FLAG_EXTENDED = 0x4000
+_FLAG_STAGE_MASK = 0x3000
+_FLAG_NAME_MASK = 0x0FFF
+
+
+def find_repository(path):
+    """
+    Find the git repository containing a directory.
+
+    Args:
+        path (Path): A directory inside the working tree.
+
+    Returns:
+        tuple: (work tree root, git directory) as Paths, or None if the
+        directory is not inside a git working tree.
+    """
+    path = Path(path).resolve()
+    for candidate in (path, *path.parents):
+        dot_git = candidate / '.git'
+        if dot_git.is_dir():
+            return candidate, dot_git
+        if dot_git.is_file():
+            # Worktrees and submodules use a "gitdir: <path>" file
+            content = dot_git.read_text(encoding='utf-8').strip()
+            if content.startswith('gitdir:'):
+                git_dir = Path(content[len('gitdir:'):].strip())
+                if not git_dir.is_absolute():
+                    git_dir = (candidate / git_dir).resolve()
+                return candidate, git_dir
+    return None
+
+
+def read_index(index_file):
+    """
+    Read the entries of a git index file.
+
+    Supports index versions 2, 3 and 4 (path prefix compression). Conflict
+    stages are collapsed so each path is reported once.
+
+    Args:
+        index_file (Path): Path to the '.git/index' file.
+
+    Returns:
+        list: (path, mode) tuples, paths relative to the work tree using '/'.
+    """
+    with open(index_file, 'rb') as f:
+        data = f.read()
+
+    signature, version, count = _HEADER.unpack_from(data, 0)
+    if signature != b'DIRC':
+        raise ValueError(f"{index_file} is not a git index file.")
+    if version not in (2, 3, 4):
+        raise ValueError(f"Unsupported git index version {version}.")
+
+    entries = []
+    offset = _HEADER.size
+    previous = b''
+    last_path = None
+    for _ in range(count):
+        entry_start = offset
+        mode = int.from_bytes(data[offset + 24:offset + 28], 'big')
+        flags = int.from_bytes(data[offset + 60:offset + 62], 'big')
+        offset += _ENTRY_FIXED_SIZE
+        if version >= 3 and flags & _FLAG_EXTENDED:
+            offset += 2
+
+        if version == 4:
+            # Varint (git's offset encoding) of bytes to strip from the previous path
+            byte = data[offset]
+            offset += 1
+            strip = byte & 0x7F
+            while byte & 0x80:
+                byte = data[offset]
+                offset += 1
+                strip = ((strip + 1) << 7) | (byte & 0x7F)
+            end = data.index(b'\0', offset)
+            path = previous[:len(previous) - strip] + data[offset:end]
+            offset = end + 1
+        else:
+            name_length = flags & _FLAG_NAME_MASK
+            if name_length < _FLAG_NAME_MASK:
+                end = offset + name_length
+            else:
+                end = data.index(b'\0', offset)
+            path = data[offset:end]
+            # Entries are NUL-padded to a multiple of 8 bytes
+            offset = entry_start + ((end - entry_start + 8) & ~7)
+
+        previous = path
+        if path == last_path and flags & _FLAG_STAGE_MASK:
+            continue
+        last_path = path
+        entries.append((os.fsdecode(path), mode))
+    return entries
+
+
+def list_untracked(work_tree):
+    """
+    List untracked files that are not ignored, using the git command line.
+
+    Args:
+        work_tree (Path): The root of the git working tree.
+
+    Returns:
+        list: Paths relative to the work tree using '/'.
+    """
+    result = subprocess.run(
+        ['git', 'ls-files', '--others', '--exclude-standard', '-z'],
+        cwd=work_tree, capture_output=True, check=True
+    )
+    return [os.fsdecode(p) for p in result.stdout.split(b'\0') if p]
+
+
+def list_repository_paths(path, include_untracked=False):
+    """
+    List the files git knows about below a directory.
+
+    Args:
+        path (Path): A directory inside a git working tree.
+        include_untracked (bool): Also list untracked, non-ignored files.
+
+    Returns:
+        list: (relative path, is_directory) tuples, relative to path using '/'.
+    """
+    repository = find_repository(path)
+    if repository is None:
+        raise ValueError(f"{path} is not inside a git repository.")
+    work_tree, git_dir = repository
+
+    prefix = Path(path).resolve().relative_to(work_tree).as_posix()
+    prefix = '' if prefix == '.' else prefix + '/'
+
+    entries = [
+        (p, mode in (MODE_DIRECTORY, MODE_GITLINK))
+        for p, mode in read_index(git_dir / 'index')
+    ]
+    if include_untracked:
+        entries.extend((p, False) for p in list_untracked(work_tree))
+
+    if not prefix:
+        return entries
+    return [(p[len(prefix):], d) for p, d in entries if p.startswith(prefix)]
+
+
+def build_path_tree(entries):
+    """
+    Turn a flat list of relative paths into nested dictionaries.
+
+    Args:
+        entries (list): (relative path, is_directory) tuples using '/'.
+
+    Returns:
+        dict: Maps names to a dict of children for directories, or None for files.
+    """
+    root = {}
+    for rel_path, is_directory in entries:
+        node = root
+        *parents, name = rel_path.rstrip('/').split('/')
+        for part in parents:
+            child = node.get(part)
+            if child is None:
+                child = node[part] = {}
+            node = child
+        if is_directory:
+            node.setdefault(name, {})
+        else:
+            node.setdefault(name, None)
+    return root
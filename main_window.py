@@ -1,16 +1,30 @@
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
-    QPushButton, QFileDialog, QComboBox, QScrollArea, QMessageBox
+    QPushButton, QFileDialog, QComboBox, QScrollArea, QMessageBox, QInputDialog,
+    QCheckBox, QSpinBox
 )
-from PyQt6.QtCore import QDir, Qt
+from PyQt6.QtCore import QDir, Qt, QThreadPool
+from PyQt6.QtGui import QKeySequence, QShortcut
 from data_manager import DataManager
 from tree_view import TreeView
 from command_builder import CommandBuilder
 from details_panel import DetailsPanel
+from tree_diff import diff_trees, saved_roots, workspace_json
+from tree_cache import LRUCache
+from duplicates import HashCache, find_duplicates
+from duplicates_dialog import DuplicatesDialog
+from command_runner import RunDialog
+from snapshot import Snapshot
+from workers import FunctionWorker
+from scanner import scan_directory, SUMMARY_THRESHOLD
+from utils import common_parent
+import os
 from pathlib import Path
 import re
 from datetime import datetime
-import json
+
+TREE_CACHE_MAX_NODES = 1_000_000  # Total items kept alive by the saved tree cache
+RUN_CACHE_MAX_CHARS = 200_000_000  # Total output kept by the code2prompt result cache
 
 
 class MainWindow(QMainWindow):
@@ -25,9 +39,26 @@ class MainWindow(QMainWindow):
         self.tree_titles = self.data_manager.tree_titles
         self.title_to_file = self.data_manager.title_to_file
 
+        # Recently shown saved trees, kept built so switching back is instant
+        self.tree_cache = LRUCache(TREE_CACHE_MAX_NODES)
+
+        # Digests used by duplicate detection, persisted between sessions
+        self.hash_cache = HashCache(Path(__file__).parent / 'cache' / 'file_hashes.json')
+        self.duplicates_dialog = None
+
+        # Output of previous code2prompt runs, keyed by command and file fingerprint
+        self.run_cache = LRUCache(RUN_CACHE_MAX_CHARS)
+
         self.unsaved_changes = False
         self.current_tree_title = None
-        self.current_directory = ""
+        self.current_directories = []  # Root directories of the workspace
+
+        # Roots are scanned concurrently; results from an outdated scan are ignored
+        self.scan_pool = QThreadPool(self)
+        self._scan_generation = 0
+        self._pending_scans = {}  # index -> path still being scanned
+        self._scan_results = {}  # index -> (path, nodes)
+        self._scan_errors = []
 
         # Main widget and layout
         main_widget = QWidget()
@@ -49,11 +80,33 @@ class MainWindow(QMainWindow):
         load_new_layout = QHBoxLayout()
         load_new_layout.addWidget(QLabel("Load New Tree:"))
         self.path_input = QLineEdit()
-        self.path_input.setPlaceholderText("Enter directory path here...")
+        self.path_input.setPlaceholderText(f"Enter directory path here (several paths separated by '{os.pathsep}')...")
         browse_button = QPushButton("Browse")
         browse_button.clicked.connect(self.browse_directory)
+        self.add_root_button = QPushButton("Add Root...")
+        self.add_root_button.setToolTip("Add another directory to the current workspace")
+        self.add_root_button.setEnabled(False)
+        self.add_root_button.clicked.connect(self.add_root_directory)
+        self.scan_source_combo = QComboBox()
+        self.scan_source_combo.addItem("Filesystem", 'filesystem')
+        self.scan_source_combo.addItem("Git Index", 'git')
+        self.scan_source_combo.addItem("Git Index + Untracked", 'git_untracked')
+        self.scan_source_combo.setToolTip("Where to read the directory contents from when loading a new tree")
+        self.summary_threshold_spin = QSpinBox()
+        self.summary_threshold_spin.setRange(0, 10_000_000)
+        self.summary_threshold_spin.setSingleStep(1000)
+        self.summary_threshold_spin.setValue(SUMMARY_THRESHOLD)
+        self.summary_threshold_spin.setPrefix("Summarize over ")
+        self.summary_threshold_spin.setSuffix(" entries")
+        self.summary_threshold_spin.setSpecialValueText("Never summarize")
+        self.summary_threshold_spin.setToolTip(
+            "Show directories with more entries than this as a summary, adding their children a page at a time"
+        )
         load_new_layout.addWidget(self.path_input)
+        load_new_layout.addWidget(self.scan_source_combo)
+        load_new_layout.addWidget(self.summary_threshold_spin)
         load_new_layout.addWidget(browse_button)
+        load_new_layout.addWidget(self.add_root_button)
         main_layout.addLayout(load_new_layout)
 
         # Label to display the loaded directory path
@@ -89,6 +142,7 @@ class MainWindow(QMainWindow):
         self.tree_view = TreeView(self)
         self.tree_view.itemStateChanged.connect(self.on_tree_item_state_changed)
         self.tree_view.itemSelected.connect(self.on_item_selected)
+        self.tree_view.rootsChanged.connect(self.on_roots_changed)
 
         # Scroll area for the tree view
         tree_scroll_area = QScrollArea()
@@ -98,6 +152,8 @@ class MainWindow(QMainWindow):
 
         # Details panel setup
         self.details_panel = DetailsPanel(self)
+        self.details_panel.commentEdited.connect(self.tree_view.set_comment)
+        self.tree_view.commentChanged.connect(self.on_comment_changed)
         details_scroll_area = QScrollArea()
         details_scroll_area.setWidgetResizable(True)
         details_scroll_area.setWidget(self.details_panel)
@@ -106,7 +162,15 @@ class MainWindow(QMainWindow):
         # Command builder setup
         self.command_builder = CommandBuilder(self)
         main_layout.addWidget(QLabel("Command Builder:"))
-        main_layout.addWidget(self.command_builder)
+        command_layout = QHBoxLayout()
+        command_layout.addWidget(self.command_builder)
+        self.per_root_checkbox = QCheckBox("One command per root")
+        self.per_root_checkbox.toggled.connect(self.on_per_root_toggled)
+        command_layout.addWidget(self.per_root_checkbox)
+        self.run_button = QPushButton("Run")
+        self.run_button.clicked.connect(self.run_command)
+        command_layout.addWidget(self.run_button)
+        main_layout.addLayout(command_layout)
 
         # Status label and buttons at the bottom
         bottom_layout = QHBoxLayout()
@@ -114,11 +178,49 @@ class MainWindow(QMainWindow):
         bottom_layout.addWidget(self.status_label)
         bottom_layout.addStretch()
 
+        # Undo/Redo buttons for comment and filter/exclude changes
+        self.undo_button = QPushButton("Undo")
+        self.undo_button.setEnabled(False)
+        self.undo_button.clicked.connect(self.tree_view.undo_stack.undo)
+        self.tree_view.undo_stack.canUndoChanged.connect(self.undo_button.setEnabled)
+        bottom_layout.addWidget(self.undo_button)
+        self.redo_button = QPushButton("Redo")
+        self.redo_button.setEnabled(False)
+        self.redo_button.clicked.connect(self.tree_view.undo_stack.redo)
+        self.tree_view.undo_stack.canRedoChanged.connect(self.redo_button.setEnabled)
+        bottom_layout.addWidget(self.redo_button)
+        # Text fields handle these keys themselves while they have focus
+        QShortcut(QKeySequence.StandardKey.Undo, self, activated=self.tree_view.undo_stack.undo)
+        QShortcut(QKeySequence.StandardKey.Redo, self, activated=self.tree_view.undo_stack.redo)
+
+        # Go to Path button
+        self.goto_button = QPushButton("Go to Path...")
+        self.goto_button.setToolTip("Reveal and select an item by its path (Ctrl+G)")
+        self.goto_button.clicked.connect(self.go_to_path)
+        bottom_layout.addWidget(self.goto_button)
+        QShortcut(QKeySequence("Ctrl+G"), self, activated=self.go_to_path)
+
+        # Compare button
+        self.compare_button = QPushButton("Compare With...")
+        self.compare_button.clicked.connect(self.compare_with_saved_tree)
+        bottom_layout.addWidget(self.compare_button)
+
+        # Find Duplicates button
+        self.duplicates_button = QPushButton("Find Duplicates")
+        self.duplicates_button.clicked.connect(self.find_duplicates)
+        bottom_layout.addWidget(self.duplicates_button)
+
         # Close Tree button
         self.close_button = QPushButton("Close Tree")
         self.close_button.clicked.connect(self.close_tree)
         bottom_layout.addWidget(self.close_button)
 
+        # Save format toggle
+        self.snapshot_checkbox = QCheckBox("Binary snapshot")
+        self.snapshot_checkbox.setToolTip("Save as a compact binary snapshot instead of JSON; faster to load for very large trees")
+        self.snapshot_checkbox.toggled.connect(self.on_snapshot_toggled)
+        bottom_layout.addWidget(self.snapshot_checkbox)
+
         # Save button
         self.save_button = QPushButton("Save Tree")
         self.save_button.clicked.connect(self.save_tree)
@@ -166,7 +268,7 @@ class MainWindow(QMainWindow):
             self.load_tree_from_path(directory)  # Load the tree immediately
 
     def load_tree_from_path(self, directory=None):
-        """Load and display the directory tree."""
+        """Load and display the directory tree, or a workspace of several directories."""
         if directory is None:
             path_str = self.path_input.text().strip()
         else:
@@ -176,6 +278,7 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Input Required", "Please enter or select a directory path.")
             return
 
+        self.details_panel.flush_comment()
         if self.unsaved_changes:
             proceed = QMessageBox.question(
                 self,
@@ -186,27 +289,108 @@ class MainWindow(QMainWindow):
             if proceed != QMessageBox.StandardButton.Yes:
                 return
 
-        path = Path(path_str)
-        if not path.exists() or not path.is_dir():
-            QMessageBox.warning(self, "Invalid Directory", "The selected directory does not exist or is not a directory.")
-            return
+        if directory is None:
+            paths = [Path(p.strip()) for p in path_str.split(os.pathsep) if p.strip()]
+        else:
+            paths = [Path(path_str)]
+        for path in paths:
+            if not path.exists() or not path.is_dir():
+                QMessageBox.warning(self, "Invalid Directory", f"'{path}' does not exist or is not a directory.")
+                return
 
         self.clear_tree_data()
-        self.current_directory = str(path.resolve())
-        self.directory_label.setText(f"Directory Path: {self.current_directory}")
         self.path_input.clear()
+        self.start_scan(paths)
 
+    def add_root_directory(self):
+        """Add another directory to the current workspace."""
+        directory = QFileDialog.getExistingDirectory(self, "Add Root Directory", QDir.homePath())
+        if not directory:
+            return
+        path = Path(directory)
+        if str(path.resolve()) in self.current_directories:
+            QMessageBox.information(self, "Add Root", "This directory is already part of the workspace.")
+            return
+        self.start_scan([path])
+
+    def start_scan(self, paths):
+        """
+        Scan directories concurrently, one worker per directory, and add them as workspace roots.
+
+        Args:
+            paths (list): The directories to scan.
+        """
+        self._scan_generation += 1
+        self._pending_scans = dict(enumerate(paths))
+        self._scan_results = {}
+        self._scan_errors = []
+        self.set_scanning(True)
+        source = self.scan_source_combo.currentData()
+        summary_threshold = self.summary_threshold_spin.value()
+        for index, path in enumerate(paths):
+            worker = FunctionWorker(self._run_scan, self._scan_generation, index, path, source, summary_threshold)
+            worker.signals.finished.connect(self.on_scan_finished)
+            self.scan_pool.start(worker)
+
+    def _run_scan(self, generation, index, path, source, summary_threshold):
+        """Worker job: scan one root, reporting errors as part of the result."""
         try:
-            self.tree_view.populate_tree(path)
-            self.unsaved_changes = True  # New tree loaded, changes unsaved
-            self.edit_title_button.setEnabled(True)
-            self.update_status_label()
-            # Update command builder
-            self.command_builder.current_directory = self.current_directory
-            root_item = self.tree_view.topLevelItem(0)
-            self.command_builder.update_command(root_item)
+            return generation, index, path, scan_directory(path, source, summary_threshold), None
+        except Exception as e:
+            return generation, index, path, None, str(e)
+
+    def on_scan_finished(self, outcome):
+        generation, index, path, nodes, error = outcome
+        if generation != self._scan_generation:
+            return
+        self._pending_scans.pop(index, None)
+        if error is not None:
+            self._scan_errors.append(f"{path}: {error}")
+        else:
+            self._scan_results[index] = (path, nodes)
+        if self._pending_scans:
+            self.status_label.setText(f"Scanning {len(self._pending_scans)} more root(s)...")
+            return
+
+        # Build roots in the order they were requested, regardless of which scan finished first
+        self.set_scanning(False)
+        try:
+            for index in sorted(self._scan_results):
+                path, nodes = self._scan_results[index]
+                root_item = self.tree_view.add_scanned_root(path, nodes)
+                self.current_directories.append(root_item.path)
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"An error occurred while loading the directory:\n{str(e)}")
+            self._scan_errors.append(str(e))
+        self._scan_results = {}
+
+        if self._scan_errors:
+            QMessageBox.critical(self, "Error", "An error occurred while loading the directory:\n" + "\n".join(self._scan_errors))
+        if self.tree_view.topLevelItemCount() == 0:
+            self.update_status_label()
+            return
+
+        self.unsaved_changes = True  # New tree loaded, changes unsaved
+        self.edit_title_button.setEnabled(True)
+        self.add_root_button.setEnabled(True)
+        self.update_directory_label()
+        self.update_status_label()
+        self.command_builder.update_command(self.tree_view.root_items())
+
+    def set_scanning(self, scanning):
+        """Disable loading controls while a scan is running."""
+        self.load_combo.setEnabled(not scanning)
+        self.add_root_button.setEnabled(not scanning and self.tree_view.topLevelItemCount() > 0)
+        self.path_input.setEnabled(not scanning)
+        if scanning:
+            self.status_label.setText(f"Scanning {len(self._pending_scans)} root(s)...")
+
+    def update_directory_label(self):
+        if not self.current_directories:
+            self.directory_label.setText("")
+        elif len(self.current_directories) == 1:
+            self.directory_label.setText(f"Directory Path: {self.current_directories[0]}")
+        else:
+            self.directory_label.setText("Workspace Roots: " + ", ".join(self.current_directories))
 
     def load_selected_tree(self, index):
         """Load a tree from its JSON file based on the selected title."""
@@ -214,6 +398,7 @@ class MainWindow(QMainWindow):
             # "-- Select Existing Tree --" selected
             return
 
+        self.details_panel.flush_comment()
         if self.unsaved_changes:
             proceed = QMessageBox.question(
                 self,
@@ -230,14 +415,26 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Tree Not Found", f"The tree file for '{title}' was not found.")
             return
 
-        try:
-            with open(tree_file, 'r', encoding='utf-8') as f:
-                tree_data = json.load(f)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load tree '{title}':\n{str(e)}")
-            return
+        # Reopening the current tree goes through the cache, as clear_tree_data caches it
+        reopening = title == self.current_tree_title and not self.unsaved_changes
+        tree_data = None
+        if not reopening and title not in self.tree_cache:
+            try:
+                tree_data = self.data_manager.load_tree(title)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to load tree '{title}':\n{str(e)}")
+                return
 
         self.clear_tree_data()
+        cached = self.tree_cache.take(title, tree_file.stat().st_mtime_ns)
+        if cached is None and tree_data is None:
+            # The cached tree went stale since the file changed on disk
+            try:
+                tree_data = self.data_manager.load_tree(title)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to load tree '{title}':\n{str(e)}")
+                return
+
         self.current_tree_title = title
         self.title_input.setText(title)
         self.title_input.setEnabled(False)
@@ -245,18 +442,26 @@ class MainWindow(QMainWindow):
         self.edit_title_button.setEnabled(True)
         self.cancel_edit_button.setVisible(False)
 
-        self.current_directory = tree_data.get('path', '')
-        self.directory_label.setText(f"Directory Path: {self.current_directory}")
         self.path_input.clear()
 
+        # Keep saving in the format the tree was loaded from
+        self.snapshot_checkbox.setChecked(self.data_manager.is_snapshot(title))
+
         try:
-            self.tree_view.load_tree_from_json(tree_data['root'])
+            if cached is not None:
+                self.tree_view.attach_roots(*cached)
+            elif isinstance(tree_data, Snapshot):
+                with tree_data:
+                    self.tree_view.load_workspace_from_snapshot(tree_data)
+            else:
+                self.tree_view.load_workspace_from_json(saved_roots(tree_data))
+            self.current_directories = [item.path for item in self.tree_view.root_items()]
+            self.update_directory_label()
+            self.add_root_button.setEnabled(True)
             self.unsaved_changes = False
             self.update_status_label()
             # Update command builder
-            self.command_builder.current_directory = self.current_directory
-            root_item = self.tree_view.topLevelItem(0)
-            self.command_builder.update_command(root_item)
+            self.command_builder.update_command(self.tree_view.root_items())
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An error occurred while loading the tree:\n{str(e)}")
 
@@ -285,6 +490,7 @@ class MainWindow(QMainWindow):
 
     def save_tree(self):
         """Save the current tree to its own JSON file."""
+        self.details_panel.flush_comment()
         title = self.title_input.text().strip()
 
         if not title:
@@ -309,6 +515,8 @@ class MainWindow(QMainWindow):
             success = self.data_manager.rename_tree(self.current_tree_title, title)
             if not success:
                 return
+            self.tree_cache.discard(self.current_tree_title)
+            self.tree_cache.discard(title)
 
             # Refresh the dropdown to reflect the renamed tree
             self.refresh_load_combo()
@@ -328,15 +536,15 @@ class MainWindow(QMainWindow):
                     return
 
         # Build the tree JSON
-        root_item = self.tree_view.topLevelItem(0)
-        if not root_item:
+        root_items = self.tree_view.root_items()
+        if not root_items:
             QMessageBox.warning(self, "No Tree Loaded", "There is no tree to save. Please load a directory tree first.")
             return
 
-        root_json = self.tree_view.build_tree_json(root_item)
+        roots_json = [self.tree_view.build_tree_json(root_item) for root_item in root_items]
 
         # Save the tree using DataManager
-        success = self.data_manager.save_tree(title, self.current_directory, root_json)
+        success = self.data_manager.save_tree(title, [item.path for item in root_items], roots_json)
         if not success:
             return
 
@@ -357,17 +565,153 @@ class MainWindow(QMainWindow):
 
         QMessageBox.information(self, "Tree Saved", f"Tree '{title}' has been saved successfully.")
 
+    def go_to_path(self):
+        """Ask for a path and reveal its item in the tree."""
+        if not self.tree_view.topLevelItemCount():
+            QMessageBox.warning(self, "No Tree Loaded", "There is no tree to search. Please load a directory tree first.")
+            return
+        # Offer the text selected in the command builder, e.g. one of its filter paths
+        selected = self.command_builder.selectedText().strip().strip('",')
+        path, ok = QInputDialog.getText(self, "Go to Path", "Absolute path, or path relative to a root:", text=selected)
+        if not ok or not path.strip():
+            return
+        if self.tree_view.reveal_path(path.strip()) is None:
+            QMessageBox.information(self, "Go to Path", f"'{path.strip()}' is not in the current tree.")
+            return
+        self.tree_view.setFocus()
+
+    def compare_with_saved_tree(self):
+        """Diff the current tree against a saved tree and highlight the differences."""
+        root_items = self.tree_view.root_items()
+        if not root_items:
+            QMessageBox.warning(self, "No Tree Loaded", "There is no tree to compare. Please load a directory tree first.")
+            return
+
+        titles = [t for t in self.data_manager.tree_titles if t != self.current_tree_title]
+        if not titles:
+            QMessageBox.information(self, "Compare Trees", "There are no other saved trees to compare with.")
+            return
+
+        title, ok = QInputDialog.getItem(self, "Compare Trees", "Compare current tree with:", titles, 0, False)
+        if not ok:
+            return
+
+        try:
+            other_data = self.data_manager.load_tree_json(title)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to load tree '{title}':\n{str(e)}")
+            return
+
+        other_roots = saved_roots(other_data)
+        current_roots = [self.tree_view.build_tree_json(root_item) for root_item in root_items]
+        if len(other_roots) == 1 and len(current_roots) == 1:
+            diff = diff_trees(other_roots[0], current_roots[0])
+            self.tree_view.highlight_diff(diff)
+        else:
+            diff = diff_trees(workspace_json(other_roots), workspace_json(current_roots))
+            self.tree_view.highlight_diff(diff, workspace=True)
+
+        if diff.is_empty():
+            QMessageBox.information(self, "Compare Trees", f"The current tree is identical to '{title}'.")
+            return
+        message = QMessageBox(self)
+        message.setWindowTitle("Compare Trees")
+        message.setText(f"Differences from '{title}': {diff.summary()}")
+        message.setDetailedText(diff.to_text())
+        message.exec()
+
+    def run_command(self):
+        """Run the built code2prompt command and stream its output into a viewer."""
+        if not self.tree_view.topLevelItemCount() or not self.command_builder.commands:
+            QMessageBox.warning(self, "No Tree Loaded", "There is no command to run. Please load a directory tree first.")
+            return
+        included_directories = []
+        included_paths = self.tree_view.collect_included_file_paths(included_directories)
+        dialog = RunDialog(
+            self.command_builder.commands,
+            included_paths,
+            included_directories,
+            self.run_cache,
+            self
+        )
+        dialog.show()
+
+    def find_duplicates(self):
+        """Hash candidate files in the background and show groups of identical files."""
+        root_items = self.tree_view.root_items()
+        if not root_items:
+            QMessageBox.warning(self, "No Tree Loaded", "There is no tree to analyze. Please load a directory tree first.")
+            return
+
+        paths = self.tree_view.collect_file_paths()
+        self.duplicates_button.setEnabled(False)
+        self.status_label.setText(f"Looking for duplicates among {len(paths)} files...")
+
+        # Directory statistics are reported below the common parent of all roots,
+        # or below each root if they only share a filesystem root
+        roots = [root_item.path for root_item in root_items]
+        parent = common_parent(roots) if len(roots) > 1 else None
+        if parent is not None:
+            roots = [parent]
+        worker = FunctionWorker(find_duplicates, roots, paths, self.hash_cache)
+        worker.signals.finished.connect(self.on_duplicates_found)
+        worker.signals.error.connect(self.on_duplicates_failed)
+        QThreadPool.globalInstance().start(worker)
+
+    def on_duplicates_found(self, report):
+        self.duplicates_button.setEnabled(True)
+        self.update_status_label()
+        if not report.groups:
+            QMessageBox.information(self, "Duplicate Files", "No duplicate files were found.")
+            return
+        if self.duplicates_dialog is not None:
+            self.duplicates_dialog.close()
+        self.duplicates_dialog = DuplicatesDialog(report, self)
+        self.duplicates_dialog.excludeRequested.connect(self.tree_view.exclude_paths)
+        self.duplicates_dialog.show()
+
+    def on_duplicates_failed(self, message):
+        self.duplicates_button.setEnabled(True)
+        self.update_status_label()
+        QMessageBox.critical(self, "Error", f"Duplicate detection failed:\n{message}")
+
+    def on_comment_changed(self, path):
+        """Mark the tree as modified when a comment is edited, undone or redone."""
+        self.details_panel.show_comment(path, self.tree_view.annotations.get(path))
+        self.unsaved_changes = True
+        self.update_status_label()
+
+    def on_snapshot_toggled(self, checked):
+        """Choose the format the next save writes."""
+        self.data_manager.save_snapshot = checked
+
+    def on_per_root_toggled(self, checked):
+        """Switch between a combined command and one command per root."""
+        self.command_builder.per_root = checked
+        if self.tree_view.topLevelItemCount():
+            self.command_builder.update_command(self.tree_view.root_items())
+
+    def on_roots_changed(self):
+        """Update the workspace after a root was removed."""
+        self.current_directories = [item.path for item in self.tree_view.root_items()]
+        self.update_directory_label()
+        self.details_panel.clear_details()
+        self.on_tree_item_state_changed()
+
     def on_tree_item_state_changed(self):
         """Update command builder when tree item state changes."""
-        root_item = self.tree_view.topLevelItem(0)
-        self.command_builder.update_command(root_item)
+        self.command_builder.update_command(self.tree_view.root_items())
         self.unsaved_changes = True
         self.update_status_label()
 
     def on_item_selected(self, item):
         """Update details panel when an item is selected."""
         if item is not None:
-            self.details_panel.update_details(item)
+            self.details_panel.update_details(
+                item,
+                self.tree_view.annotations.get(item.path),
+                self.tree_view.summaries.get(item.path)
+            )
         else:
             self.details_panel.clear_details()
 
@@ -378,11 +722,35 @@ class MainWindow(QMainWindow):
         else:
             self.status_label.setText("All changes saved")
 
+    def cache_current_tree(self):
+        """Keep the built tree in the cache if it matches its saved file."""
+        if not self.current_tree_title or self.unsaved_changes:
+            return
+        tree_file = self.title_to_file.get(self.current_tree_title)
+        if tree_file is None or not tree_file.exists():
+            return
+        detached = self.tree_view.detach_roots()
+        if detached is None:
+            return
+        node_count = detached[1]
+        self.tree_cache.put(
+            self.current_tree_title,
+            detached,
+            node_count,
+            tree_file.stat().st_mtime_ns
+        )
+
     def clear_tree_data(self):
         """Clear all data related to the current tree."""
+        self.details_panel.flush_comment()
+        self._scan_generation += 1  # Ignore scans still running for the previous tree
+        self._pending_scans = {}
+        self.set_scanning(False)
+        self.cache_current_tree()
         self.tree_view.clear()
         self.current_tree_title = None
-        self.current_directory = ""
+        self.current_directories = []
+        self.add_root_button.setEnabled(False)
         self.unsaved_changes = False
         self.title_input.setText("")
         self.title_input.setEnabled(False)
@@ -395,9 +763,11 @@ class MainWindow(QMainWindow):
         self.update_status_label()
         self.details_panel.clear_details()
         self.command_builder.clear()
+        self.snapshot_checkbox.setChecked(False)
 
     def close_tree(self):
         """Close the current tree."""
+        self.details_panel.flush_comment()
         if self.unsaved_changes:
             proceed = QMessageBox.question(
                 self,
@@ -412,6 +782,7 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         """Handle actions on closing the application."""
+        self.details_panel.flush_comment()
         if self.unsaved_changes:
             reply = QMessageBox.question(
                 self,
@@ -0,0 +1,145 @@
+import os
+import stat
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+MAX_LINE_COUNT_SIZE = 256 * 1024 * 1024  # Larger files are not scanned for line counts
+_CHUNK_SIZE = 1024 * 1024
+
+
+class FileMetadata:
+    """Size, modification time and line count of a file or directory."""
+    __slots__ = ('size', 'mtime', 'lines', 'is_dir')
+
+    def __init__(self, size, mtime, lines, is_dir):
+        self.size = size  # None for directories
+        self.mtime = mtime  # Seconds since the epoch
+        self.lines = lines  # None for directories, binary or very large files
+        self.is_dir = is_dir
+
+
+class MetadataCache:
+    """
+    Thread-safe LRU cache of FileMetadata keyed by path.
+
+    Entries are only returned while the file's mtime and size still match.
+    """
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, mtime_ns, size):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != (mtime_ns, size):
+                return None
+            self._entries.move_to_end(path)
+            return entry[1]
+
+    def put(self, path, mtime_ns, size, metadata):
+        with self._lock:
+            self._entries[path] = ((mtime_ns, size), metadata)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def is_readable_file(st):
+    """
+    Return True if a stat result describes a file that is safe to open and read.
+
+    Opening a FIFO or device node can block forever, so only regular files qualify.
+    """
+    return stat.S_ISREG(st.st_mode)
+
+
+def count_lines(path):
+    """
+    Count the lines of a text file.
+
+    Returns None for binary files (containing a NUL byte in the first chunk).
+    """
+    lines = 0
+    last = b''
+    with open(path, 'rb') as f:
+        first = True
+        while True:
+            chunk = f.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            if first and b'\0' in chunk:
+                return None
+            first = False
+            lines += chunk.count(b'\n')
+            last = chunk
+    if last and not last.endswith(b'\n'):
+        lines += 1
+    return lines
+
+
+def get_metadata(path, cache=None):
+    """
+    Compute the metadata of a path, consulting the cache first.
+
+    Returns None if the path cannot be read.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if cache is not None:
+        metadata = cache.get(path, st.st_mtime_ns, st.st_size)
+        if metadata is not None:
+            return metadata
+
+    if stat.S_ISDIR(st.st_mode):
+        metadata = FileMetadata(None, st.st_mtime, None, True)
+    else:
+        lines = None
+        if is_readable_file(st) and st.st_size <= MAX_LINE_COUNT_SIZE:
+            try:
+                lines = count_lines(path)
+            except OSError:
+                pass
+        metadata = FileMetadata(st.st_size, st.st_mtime, lines, False)
+
+    if cache is not None:
+        cache.put(path, st.st_mtime_ns, st.st_size, metadata)
+    return metadata
+
+
+def get_metadata_batch(paths, cache=None):
+    """Compute metadata for several paths. Returns a list of (path, FileMetadata or None)."""
+    return [(path, get_metadata(path, cache)) for path in paths]
+
+
+def format_size(size):
+    """Format a byte count for display."""
+    if size is None:
+        return ""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return ""
+
+
+def format_mtime(mtime):
+    """Format a modification time for display."""
+    if mtime is None:
+        return ""
+    return datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M')
+
+
+def format_lines(lines):
+    """Format a line count for display."""
+    if lines is None:
+        return ""
+    return f"{lines:,}"
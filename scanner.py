@@ -0,0 +1,207 @@
+import os
+from pathlib import Path
+from git_index import list_repository_paths, build_path_tree
+from metadata import format_size
+
+# Scan sources accepted by scan_directory
+SCAN_SOURCES = ('filesystem', 'git', 'git_untracked')
+SUMMARY_THRESHOLD = 5000  # Default number of entries above which a directory is summarized
+SUMMARY_HISTOGRAM_ROWS = 10  # Extensions listed by DirectorySummary.describe
+
+
+class DirectorySummary:
+    """
+    Stand-in for the children of a directory with too many entries to show at once.
+
+    Holds the entry count, the total size of the files directly inside and
+    a histogram of their extensions, plus the child nodes themselves so
+    TreeView can turn them into items a page at a time.
+    """
+
+    def __init__(self, nodes, count, total_size, extensions, directories):
+        self.nodes = nodes  # Child nodes not yet shown as items
+        self.loaded = 0  # Number of nodes already taken by take_page
+        self.count = count  # Entries directly inside the directory
+        self.total_size = total_size  # Bytes in the files directly inside
+        self.extensions = extensions  # Extension -> number of files
+        self.directories = directories  # Subdirectories directly inside
+
+    @property
+    def remaining(self):
+        return len(self.nodes) - self.loaded
+
+    def take_page(self, size):
+        """Return the next size child nodes and mark them as loaded."""
+        page = self.nodes[self.loaded:self.loaded + size]
+        self.loaded += len(page)
+        if not self.remaining:
+            # Every node is an item now, so there is nothing left to hold on to
+            self.nodes = []
+            self.loaded = 0
+        return page
+
+    def index_of(self, name):
+        """Return the position of a pending child among the remaining nodes, or -1."""
+        for i in range(self.loaded, len(self.nodes)):
+            if self.nodes[i][2] == name:
+                return i - self.loaded
+        return -1
+
+    def file_paths(self, base, directories=None):
+        """
+        Yield the paths of all files below the pending nodes.
+
+        Args:
+            base (str): The path of the summarized directory.
+            directories (list): If given, the paths of the pending directories are appended to it.
+        """
+        stack = [(base, self.nodes[self.loaded:])]
+        while stack:
+            directory, nodes = stack.pop()
+            for _, _, name, children in nodes:
+                if not name:
+                    continue
+                path = os.path.join(directory, name)
+                if children is None:
+                    yield path
+                    continue
+                if directories is not None:
+                    directories.append(path)
+                if isinstance(children, DirectorySummary):
+                    stack.append((path, children.nodes[children.loaded:]))
+                else:
+                    stack.append((path, children))
+
+    def describe(self):
+        """Return a multi-line description of the directory contents."""
+        lines = [f"{self.count:,} entries ({self.directories:,} directories), "
+                 f"{format_size(self.total_size)} in files"]
+        histogram = sorted(self.extensions.items(), key=lambda e: (-e[1], e[0]))
+        for extension, count in histogram[:SUMMARY_HISTOGRAM_ROWS]:
+            lines.append(f"  {extension or '(no extension)'}: {count:,}")
+        if len(histogram) > SUMMARY_HISTOGRAM_ROWS:
+            other = sum(count for _, count in histogram[SUMMARY_HISTOGRAM_ROWS:])
+            lines.append(f"  other: {other:,}")
+        return "\n".join(lines)
+
+    def to_json(self):
+        return {
+            "count": self.count,
+            "size": self.total_size,
+            "extensions": self.extensions,
+            "directories": self.directories
+        }
+
+    @classmethod
+    def from_json(cls, summary_json, nodes):
+        return cls(
+            nodes,
+            summary_json.get('count', len(nodes)),
+            summary_json.get('size', 0),
+            summary_json.get('extensions', {}),
+            summary_json.get('directories', 0)
+        )
+
+
+def summarize_directory(path, nodes, sizes=None):
+    """
+    Build a DirectorySummary for the scanned children of a directory.
+
+    Args:
+        path (Path): The directory, used to stat its files for their size.
+        nodes (list): Child nodes as returned by scan_directory.
+        sizes (dict): File sizes by name, if already known from the scan;
+            files missing from it are stat'ed.
+    """
+    total_size = 0
+    extensions = {}
+    directories = 0
+    for _, _, name, children in nodes:
+        if not name:
+            continue
+        if children is not None:
+            directories += 1
+            continue
+        extension = os.path.splitext(name)[1].lower()
+        extensions[extension] = extensions.get(extension, 0) + 1
+        if sizes is not None and name in sizes:
+            total_size += sizes[name]
+            continue
+        try:
+            total_size += os.stat(os.path.join(path, name)).st_size
+        except OSError:
+            pass
+    return DirectorySummary(nodes, len(nodes), total_size, extensions, directories)
+
+
+def scan_directory(path, source='filesystem', summary_threshold=None):
+    """
+    Scan a directory into plain tuples, without touching any Qt objects.
+
+    Scanning is safe to run in a worker thread; TreeView builds its items
+    from the result in the GUI thread.
+
+    Args:
+        path (Path): The directory to scan.
+        source (str): 'filesystem' to walk the disk, 'git' to read the
+            repository's index, or 'git_untracked' to read the index plus
+            untracked files that are not ignored.
+        summary_threshold (int): Summarize directories with more entries than
+            this instead of listing them; None or 0 never summarizes.
+
+    Returns:
+        list: Child nodes of the directory as (text, type, name, children)
+        tuples, sorted directories first. children is a list for directories
+        and None for files; name is empty for placeholder nodes such as
+        "[Permission Denied]". Any list of children above the threshold,
+        including the returned one, is replaced by a DirectorySummary.
+    """
+    path = Path(path)
+    if source not in SCAN_SOURCES:
+        raise ValueError(f"Unknown scan source '{source}'.")
+    if source != 'filesystem':
+        entries = list_repository_paths(path, include_untracked=(source == 'git_untracked'))
+        return _scan_path_tree(build_path_tree(entries), path, summary_threshold)
+    return _scan_filesystem(path, summary_threshold)
+
+
+def _scan_filesystem(path, summary_threshold=None):
+    nodes = []
+    files = []
+    try:
+        # Directory entries carry their type, so sorting and walking need no stat per entry
+        with os.scandir(path) as it:
+            entries = [(not entry.is_dir(), entry.name.lower(), entry) for entry in it]
+        entries.sort(key=lambda e: (e[0], e[1]))
+        for is_file, _, entry in entries:
+            if is_file:
+                nodes.append((entry.name, "File", entry.name, None))
+                files.append(entry)
+            else:
+                nodes.append((entry.name, "Directory", entry.name, _scan_filesystem(entry.path, summary_threshold)))
+    except PermissionError:
+        nodes.append(("[Permission Denied]", "Directory", "", []))
+    except Exception as e:
+        nodes.append((f"[Error: {str(e)}]", "File", "", None))
+    if summary_threshold and len(nodes) > summary_threshold:
+        sizes = {}
+        for entry in files:
+            try:
+                sizes[entry.name] = entry.stat().st_size
+            except OSError:
+                sizes[entry.name] = 0
+        return summarize_directory(path, nodes, sizes)
+    return nodes
+
+
+def _scan_path_tree(node, path, summary_threshold=None):
+    """Convert the nested dictionaries built by build_path_tree into scan nodes."""
+    nodes = []
+    for name, children in sorted(node.items(), key=lambda x: (x[1] is None, x[0].lower())):
+        if children is not None:
+            nodes.append((name, "Directory", name, _scan_path_tree(children, path / name, summary_threshold)))
+        else:
+            nodes.append((name, "File", name, None))
+    if summary_threshold and len(nodes) > summary_threshold:
+        return summarize_directory(path, nodes)
+    return nodes
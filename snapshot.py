@@ -0,0 +1,247 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from tree_diff import has_annotations
+
+# Binary snapshot of a saved tree, an alternative to the JSON format.
+#
+# Layout, little-endian:
+#   header    MAGIC, version, node count, meta size, strings size
+#   meta      UTF-8 JSON: title, root paths, and the sparse per-node data
+#             (comments and directory summaries) keyed by node index
+#   strings   UTF-8 names separated by NUL, each distinct name stored once
+#   padding   to a multiple of 4 bytes
+#   parents   int32 per node, the index of its parent or -1 for roots
+#   names     uint32 per node, the index of its name in the strings
+#   flags     uint8 per node, the state and type codes below
+#
+# Nodes are stored in preorder, so a parent always comes before its children
+# and the children of a node keep their order.
+SNAPSHOT_SUFFIX = '.snap'
+MAGIC = b'PGUISNAP'
+VERSION = 1
+_HEADER = struct.Struct('<8sIIII')
+
+STATE_CODES = {'none': 0, 'filter': 1, 'exclude': 2}
+STATE_NAMES = ('none', 'filter', 'exclude')
+FLAG_STATE_MASK = 0x03
+FLAG_FILTER_DIRECT = 0x04
+FLAG_EXCLUDE_DIRECT = 0x08
+FLAG_DIRECTORY = 0x10
+FLAG_PLACEHOLDER = 0x20
+
+
+class SnapshotError(ValueError):
+    """Raised when a file is not a snapshot this version can read."""
+
+
+def write_snapshot(snapshot_file, title, paths, roots_json):
+    """
+    Write a tree to a binary snapshot.
+
+    Args:
+        snapshot_file (Path): The file to write, replaced atomically.
+        title (str): The tree title.
+        paths (list): The full path of each root.
+        roots_json (list): One node per root, as built by TreeView.build_tree_json.
+    """
+    parents = array('i')
+    names = array('I')
+    flags = bytearray()
+    name_indices = {}
+    comments = {}
+    summaries = {}
+
+    stack = [(root_json, -1) for root_json in reversed(roots_json)]
+    while stack:
+        node, parent = stack.pop()
+        index = len(parents)
+        name = node.get('name', '')
+        name_index = name_indices.get(name)
+        if name_index is None:
+            name_index = name_indices[name] = len(name_indices)
+        parents.append(parent)
+        names.append(name_index)
+
+        node_flags = 0
+        if node.get('is_filter_direct', False):
+            node_flags |= FLAG_FILTER_DIRECT | STATE_CODES['filter']
+        elif node.get('is_exclude_direct', False):
+            node_flags |= FLAG_EXCLUDE_DIRECT | STATE_CODES['exclude']
+        if node.get('type', '').lower() == 'directory':
+            node_flags |= FLAG_DIRECTORY
+        if parent >= 0 and node.get('path', None) == '':
+            node_flags |= FLAG_PLACEHOLDER
+        flags.append(node_flags)
+
+        if node.get('comment'):
+            comments[index] = node['comment']
+        contents = node.get('contents', [])
+        if 'summary' in node:
+            # Children up to the last annotated one are shown as items on load
+            shown = 0
+            for i, child in enumerate(contents):
+                if has_annotations(child):
+                    shown = i + 1
+            summaries[index] = dict(node['summary'], shown=shown)
+        for child in reversed(contents):
+            stack.append((child, index))
+
+    meta = json.dumps({
+        "title": title,
+        "paths": paths,
+        "comments": comments,
+        "summaries": summaries
+    }, ensure_ascii=False).encode('utf-8')
+    strings = '\0'.join(name_indices).encode('utf-8')
+    padding = -(_HEADER.size + len(meta) + len(strings)) % 4
+    if sys.byteorder != 'little':
+        parents.byteswap()
+        names.byteswap()
+
+    tmp_file = snapshot_file.with_suffix('.tmp')
+    with open(tmp_file, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(parents), len(meta), len(strings)))
+        f.write(meta)
+        f.write(strings)
+        f.write(b'\0' * padding)
+        f.write(parents.tobytes())
+        f.write(names.tobytes())
+        f.write(flags)
+    os.replace(tmp_file, snapshot_file)
+
+
+def _read_header(data, size):
+    if size < _HEADER.size:
+        raise SnapshotError("File is too short to be a tree snapshot.")
+    magic, version, node_count, meta_size, strings_size = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError("File is not a tree snapshot.")
+    if version != VERSION:
+        raise SnapshotError(f"Unsupported tree snapshot version {version}.")
+    return node_count, meta_size, strings_size
+
+
+def read_snapshot_title(snapshot_file):
+    """Return the title of a snapshot, reading only its header and metadata."""
+    with open(snapshot_file, 'rb') as f:
+        header = f.read(_HEADER.size)
+        _, meta_size, _ = _read_header(header, len(header))
+        meta = json.loads(f.read(meta_size).decode('utf-8'))
+    return meta['title']
+
+
+class Snapshot:
+    """
+    A memory-mapped tree snapshot.
+
+    The per-node arrays are views into the mapped file, so opening a
+    snapshot allocates nothing per node except the distinct names. Close it,
+    or use it as a context manager, once the tree has been built.
+    """
+
+    def __init__(self, snapshot_file):
+        with open(snapshot_file, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = []
+        try:
+            self._parse()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self):
+        data = self._mmap
+        node_count, meta_size, strings_size = _read_header(data, len(data))
+        offset = _HEADER.size
+        meta = json.loads(data[offset:offset + meta_size].decode('utf-8'))
+        offset += meta_size
+        self.names = data[offset:offset + strings_size].decode('utf-8').split('\0')
+        offset += strings_size
+        offset += -offset % 4
+        if len(data) < offset + node_count * 9:
+            raise SnapshotError("Tree snapshot is truncated.")
+
+        self.title = meta['title']
+        self.paths = meta['paths']
+        self.comments = {int(index): comment for index, comment in meta['comments'].items()}
+        self.summaries = {int(index): summary for index, summary in meta['summaries'].items()}
+        self.node_count = node_count
+        self.parents = self._array('i', offset, node_count)
+        offset += node_count * 4
+        self.name_indices = self._array('I', offset, node_count)
+        offset += node_count * 4
+        self.flags = self._array('B', offset, node_count)
+
+    def _array(self, typecode, offset, count):
+        size = count * array(typecode).itemsize
+        if sys.byteorder != 'little' and typecode != 'B':
+            values = array(typecode, self._mmap[offset:offset + size])
+            values.byteswap()
+            return values
+        if not self._views:
+            self._views.append(memoryview(self._mmap))
+        view = self._views[0][offset:offset + size].cast(typecode)
+        self._views.append(view)
+        return view
+
+    def close(self):
+        # Views must be released before the mapping can be closed
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self.parents = self.name_indices = self.flags = None
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def state(self, index):
+        """Return (filter_state, is_filter_direct, is_exclude_direct) of a node."""
+        flags = self.flags[index]
+        return (
+            STATE_NAMES[flags & FLAG_STATE_MASK],
+            bool(flags & FLAG_FILTER_DIRECT),
+            bool(flags & FLAG_EXCLUDE_DIRECT)
+        )
+
+    def to_tree_json(self):
+        """Rebuild the tree data in the JSON file format, e.g. to compare it with another tree."""
+        nodes = []
+        roots = []
+        states = []  # Effective state code of each node, inherited unless set directly
+        for index in range(self.node_count):
+            flags = self.flags[index]
+            parent = self.parents[index]
+            state = flags & FLAG_STATE_MASK
+            if not state and parent >= 0:
+                state = states[parent]
+            states.append(state)
+            node = {
+                "name": self.names[self.name_indices[index]],
+                "type": "directory" if flags & FLAG_DIRECTORY else "file",
+                "filter_state": STATE_NAMES[state],
+                "is_filter_direct": bool(flags & FLAG_FILTER_DIRECT),
+                "is_exclude_direct": bool(flags & FLAG_EXCLUDE_DIRECT)
+            }
+            if index in self.comments:
+                node["comment"] = self.comments[index]
+            if index in self.summaries:
+                node["summary"] = {k: v for k, v in self.summaries[index].items() if k != 'shown'}
+            if flags & FLAG_PLACEHOLDER:
+                node["path"] = ""
+            if parent < 0:
+                node["path"] = self.paths[len(roots)]
+                roots.append(node)
+            else:
+                nodes[parent].setdefault("contents", []).append(node)
+            nodes.append(node)
+        if len(roots) == 1:
+            return {"title": self.title, "path": self.paths[0], "root": roots[0]}
+        return {"title": self.title, "paths": self.paths, "roots": roots}
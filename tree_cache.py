@@ -0,0 +1,66 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Least-recently-used cache bounded by the total cost of its entries.
+
+    Each entry carries a version (e.g. a file mtime); looking it up with a
+    different version treats it as stale and drops it.
+    """
+
+    def __init__(self, max_cost):
+        self.max_cost = max_cost
+        self.total_cost = 0
+        self._entries = OrderedDict()  # key -> (value, cost, version)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, version):
+        """Return the cached value, or None if missing or stale."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[2] != version:
+            self.discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def take(self, key, version):
+        """Remove and return the cached value, or None if missing or stale."""
+        value = self.get(key, version)
+        if value is not None:
+            self.discard(key)
+        return value
+
+    def put(self, key, value, cost, version):
+        """
+        Insert a value, evicting the least recently used entries to stay within max_cost.
+
+        Values costing more than max_cost on their own are not cached.
+        Returns True if the value was cached.
+        """
+        self.discard(key)
+        if cost > self.max_cost:
+            return False
+        self._entries[key] = (value, cost, version)
+        self.total_cost += cost
+        while self.total_cost > self.max_cost:
+            _, (_, evicted_cost, _) = self._entries.popitem(last=False)
+            self.total_cost -= evicted_cost
+        return True
+
+    def discard(self, key):
+        """Remove an entry if present."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_cost -= entry[1]
+
+    def clear(self):
+        self._entries.clear()
+        self.total_cost = 0
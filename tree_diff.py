@@ -0,0 +1,170 @@
+import hashlib
+
+
+class TreeDiff:
+    """Result of comparing two saved trees."""
+
+    def __init__(self):
+        self.added = []    # Relative paths only present in the new tree
+        self.removed = []  # Relative paths only present in the old tree
+        self.changed = []  # (relative path, field, old value, new value)
+
+    def is_empty(self):
+        return not (self.added or self.removed or self.changed)
+
+    def summary(self):
+        """Return a short human-readable summary of the differences."""
+        return (f"{len(self.added)} added, {len(self.removed)} removed, "
+                f"{len(self.changed)} changed")
+
+    def to_text(self):
+        """Return a line-per-difference listing of the diff."""
+        lines = []
+        for path in self.added:
+            lines.append(f"+ {path}")
+        for path in self.removed:
+            lines.append(f"- {path}")
+        for path, field, old, new in self.changed:
+            lines.append(f"~ {path}: {field} {old!r} -> {new!r}")
+        return "\n".join(lines)
+
+
+def _direct_state(node_json):
+    """Return the directly-set filter state of a node, ignoring inherited state."""
+    if node_json.get('is_exclude_direct', False):
+        return 'exclude'
+    if node_json.get('is_filter_direct', False):
+        return 'filter'
+    return 'none'
+
+
+def _node_signature(node_json):
+    """Return the fields of a node that take part in the comparison."""
+    return (
+        node_json.get('type', '').lower(),
+        _direct_state(node_json),
+        node_json.get('comment', ''),
+    )
+
+
+def compute_subtree_hashes(root_json):
+    """
+    Compute a digest for every subtree of a saved tree.
+
+    The digest of a node covers its name, type, direct filter state and
+    comment, plus the digests of its children, so two subtrees with equal
+    digests are identical and can be skipped when diffing.
+
+    Args:
+        root_json (dict): The 'root' node of a saved tree.
+
+    Returns:
+        dict: Mapping of id(node dict) to its digest bytes.
+    """
+    hashes = {}
+    # Iterative post-order traversal so very deep trees do not hit the recursion limit
+    stack = [(root_json, False)]
+    while stack:
+        node, visited = stack.pop()
+        contents = node.get('contents', [])
+        if not visited:
+            stack.append((node, True))
+            for child in contents:
+                stack.append((child, False))
+            continue
+        data = '\0'.join((node.get('name', ''),) + _node_signature(node)).encode('utf-8')
+        if contents:
+            data += b''.join([hashes[id(child)] for child in contents])
+        hashes[id(node)] = hashlib.blake2b(data, digest_size=16).digest()
+    return hashes
+
+
+def _collect_subtree_paths(node_json, prefix, out):
+    """Append the relative path of a node and all its descendants to out."""
+    stack = [(node_json, prefix)]
+    while stack:
+        node, path = stack.pop()
+        out.append(path)
+        for child in reversed(node.get('contents', [])):
+            stack.append((child, f"{path}/{child.get('name', '')}"))
+
+
+def has_annotations(node_json):
+    """Return True if a node or any of its descendants has a comment or direct filter state."""
+    stack = [node_json]
+    while stack:
+        node = stack.pop()
+        if node.get('comment') or _direct_state(node) != 'none':
+            return True
+        stack.extend(node.get('contents', []))
+    return False
+
+
+def saved_roots(tree_data):
+    """Return the list of root nodes of a saved tree, which may be a multi-root workspace."""
+    if 'roots' in tree_data:
+        return tree_data['roots']
+    return [tree_data['root']]
+
+
+def workspace_json(roots_json):
+    """
+    Wrap the roots of a workspace in a nameless node so they can be diffed as one tree.
+
+    Paths in the resulting diff start with the name of the root they belong to.
+    """
+    return {"name": "", "type": "directory", "contents": list(roots_json)}
+
+
+def diff_trees(old_root, new_root):
+    """
+    Compare two saved trees and report their structural differences.
+
+    Nodes are matched by name under their parent, so trees saved from the
+    same repository at different locations can still be compared. Subtrees
+    whose digests match are skipped entirely.
+
+    Args:
+        old_root (dict): The 'root' node of the tree to compare against.
+        new_root (dict): The 'root' node of the tree being compared.
+
+    Returns:
+        TreeDiff: Paths are relative to the root and use '/' as separator.
+    """
+    old_hashes = compute_subtree_hashes(old_root)
+    new_hashes = compute_subtree_hashes(new_root)
+    result = TreeDiff()
+
+    stack = [(old_root, new_root, '')]
+    while stack:
+        old_node, new_node, path = stack.pop()
+        if old_hashes[id(old_node)] == new_hashes[id(new_node)]:
+            continue
+
+        display_path = path or '/'
+        old_type, old_state, old_comment = _node_signature(old_node)
+        new_type, new_state, new_comment = _node_signature(new_node)
+        if old_type != new_type:
+            result.changed.append((display_path, 'type', old_type, new_type))
+        if old_state != new_state:
+            result.changed.append((display_path, 'filter_state', old_state, new_state))
+        if old_comment != new_comment:
+            result.changed.append((display_path, 'comment', old_comment, new_comment))
+
+        old_children = {c.get('name', ''): c for c in old_node.get('contents', [])}
+        new_children = {c.get('name', ''): c for c in new_node.get('contents', [])}
+        for name, new_child in new_children.items():
+            child_path = f"{path}/{name}"
+            old_child = old_children.get(name)
+            if old_child is None:
+                _collect_subtree_paths(new_child, child_path, result.added)
+            else:
+                stack.append((old_child, new_child, child_path))
+        for name, old_child in old_children.items():
+            if name not in new_children:
+                _collect_subtree_paths(old_child, f"{path}/{name}", result.removed)
+
+    result.added.sort()
+    result.removed.sort()
+    result.changed.sort()
+    return result
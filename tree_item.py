@@ -1,14 +1,58 @@
+import os
+import sys
 from PyQt6.QtWidgets import QTreeWidgetItem
 
 class TreeItem(QTreeWidgetItem):
     def __init__(self, *args):
         super().__init__(*args)
-        self.comment = ""
         self.filter_state = 'none'  # 'none', 'filter', 'exclude'
-        self.path = ""  # Full path of the item
+        self.name = ""  # Interned path component of the item
+        self.base_path = None  # Full path, only set on root items
+        self._full_path = None  # Memoized result of the path property, for items with children
         self.is_filter_direct = False
         self.is_exclude_direct = False
 
+    def set_name(self, name):
+        """
+        Set the path component of the item, relative to its parent.
+
+        Args:
+            name (str): The file or directory name. An empty name marks a
+                placeholder item (e.g. "[Permission Denied]") without a path.
+        """
+        self.name = sys.intern(name)
+        self._full_path = None
+
+    @property
+    def path(self):
+        """
+        Full path of the item, derived from its parent chain.
+
+        Only root items store a full path. Items with children memoize the
+        result, since their descendants derive their paths from it; leaves
+        build it on each access, so a full walk holds no path per file.
+        """
+        if self._full_path is not None:
+            return self._full_path
+        if self.base_path is not None:
+            return self.base_path
+        if not self.name:
+            return ""
+        parent = self.parent()
+        if parent is None:
+            # Not attached yet, so the path cannot be memoized
+            return self.name
+        path = os.path.join(parent.path, self.name)
+        if self.childCount():
+            self._full_path = path
+        return path
+
+    @path.setter
+    def path(self, value):
+        """Set the full path of a root item."""
+        self.base_path = value
+        self._full_path = None
+
     def set_filter(self, state, direct=True):
         """
         Set the filter state of the item.
@@ -1,62 +1,285 @@
-from PyQt6.QtWidgets import QTreeWidget, QMenu, QMessageBox
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtWidgets import QTreeWidget, QTreeWidgetItem, QMenu, QMessageBox
+from PyQt6.QtCore import Qt, pyqtSignal, QThreadPool, QTimer
+from PyQt6.QtGui import QColor, QUndoStack
+import os
 from pathlib import Path
 from tree_item import TreeItem
+from scanner import DirectorySummary
+from metadata import MetadataCache, get_metadata_batch, format_size, format_mtime, format_lines
+from workers import FunctionWorker
+from annotations import AnnotationStore, CommentCommand, FilterStateCommand
+from tree_diff import has_annotations
+from snapshot import FLAG_DIRECTORY, FLAG_PLACEHOLDER
+
+# Metadata columns, filled lazily for visible rows
+SIZE_COLUMN = 2
+MODIFIED_COLUMN = 3
+LINES_COLUMN = 4
+METADATA_PREFETCH_ROWS = 50  # Rows above and below the viewport to prefetch
+METADATA_BATCH_SIZE = 32  # Paths per worker task
+SUMMARY_PAGE_SIZE = 500  # Children of a summarized directory shown per page
 
 class TreeView(QTreeWidget):
     # Signals to communicate with other components
     itemStateChanged = pyqtSignal()
     itemSelected = pyqtSignal(object)  # Changed from pyqtSignal(TreeItem)
+    rootsChanged = pyqtSignal()  # A root was removed from the workspace
+    commentChanged = pyqtSignal(str)  # Path of the item whose comment changed
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setHeaderLabels(["Name", "Type"])
+        self.setHeaderLabels(["Name", "Type", "Size", "Modified", "Lines"])
         self.setColumnWidth(0, 400)
         self.setColumnWidth(1, 100)
+        self.setColumnWidth(SIZE_COLUMN, 80)
+        self.setColumnWidth(MODIFIED_COLUMN, 120)
+        self.setColumnWidth(LINES_COLUMN, 70)
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.open_context_menu)
 
         self.itemSelectionChanged.connect(self.on_item_selection_changed)
 
-    def populate_tree(self, path):
-        """Recursively populate the tree widget with directory contents."""
-        self.clear()
+        # Metadata is computed in a worker pool for visible rows only
+        self.metadata_pool = QThreadPool(self)
+        self.metadata_pool.setMaxThreadCount(4)
+        self.metadata_cache = MetadataCache()
+        self._metadata_pending = {}  # path -> item waiting for metadata
+        self._sort_generation = 0  # Bumped per sort request; results of older requests are dropped
+        self._sort_path = None  # Directory of the sort request in flight
+        self._diff_highlighted = False
+        self.node_count = 0  # Number of items in the tree, including the root
+        self.child_index = {}  # id(directory item) -> {name: child item}, kept in sync as items are added and removed
+        self.annotations = AnnotationStore()  # Comments by full path, only for items that have one
+        self.summaries = {}  # Full path -> DirectorySummary of directories shown a page at a time
+        # Comment and filter/exclude changes, recorded by path as old and new values
+        self.undo_stack = QUndoStack(self)
+        self._metadata_timer = QTimer(self)
+        self._metadata_timer.setSingleShot(True)
+        self._metadata_timer.setInterval(50)
+        self._metadata_timer.timeout.connect(self.request_visible_metadata)
+        self.verticalScrollBar().valueChanged.connect(self.schedule_visible_metadata)
+        self.itemExpanded.connect(self.on_item_expanded)
+        self.itemExpanded.connect(self.schedule_visible_metadata)
+
+        self.header().setSectionsClickable(True)
+        self.header().sectionClicked.connect(self.on_header_clicked)
+
+    def add_scanned_root(self, path, nodes):
+        """
+        Add a root directory to the workspace from the result of scan_directory.
+
+        Args:
+            path (Path): The scanned directory.
+            nodes (list): The scan result for the directory.
+
+        Returns:
+            TreeItem: The new root item.
+        """
+        path = Path(path)
         root_item = TreeItem([path.name, "Directory"])
-        root_item.comment = ""
         root_item.path = str(path.resolve())
         self.addTopLevelItem(root_item)
-        self._populate_tree_recursive(root_item, path)
+        self.node_count += 1
+        if isinstance(nodes, DirectorySummary):
+            # The first page is shown when the root is expanded
+            self._set_summary(root_item, nodes)
+        else:
+            self._populate_tree_from_scan(root_item, nodes)
         root_item.setExpanded(True)
         self.update_item_appearance(root_item)
+        self.schedule_visible_metadata()
+        return root_item
 
-    def _populate_tree_recursive(self, parent_item, path):
-        try:
-            for item in sorted(path.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower())):
-                if item.is_dir():
-                    child_item = TreeItem([item.name, "Directory"])
-                    child_item.comment = ""
-                    child_item.path = str(item.resolve())
-                    parent_item.addChild(child_item)
-                    self._populate_tree_recursive(child_item, item)
-                else:
-                    child_item = TreeItem([item.name, "File"])
-                    child_item.comment = ""
-                    child_item.path = str(item.resolve())
-                    parent_item.addChild(child_item)
-        except PermissionError:
-            child_item = TreeItem(["[Permission Denied]", "Directory"])
-            child_item.comment = ""
-            child_item.path = ""
-            parent_item.addChild(child_item)
-        except Exception as e:
-            child_item = TreeItem([f"[Error: {str(e)}]", "File"])
-            child_item.comment = ""
-            child_item.path = ""
+    def _populate_tree_from_scan(self, parent_item, nodes):
+        for text, type_, name, children in nodes:
+            child_item = TreeItem([text, type_])
+            if name:
+                child_item.set_name(name)
             parent_item.addChild(child_item)
+            self.node_count += 1
+            if name:
+                self._index_child(parent_item, child_item)
+            if isinstance(children, DirectorySummary):
+                self._set_summary(child_item, children)
+            elif children:
+                self._populate_tree_from_scan(child_item, children)
+
+    def _set_summary(self, item, summary):
+        """Show a directory as a summary whose children are added a page at a time."""
+        self.summaries[item.path] = summary
+        item.setChildIndicatorPolicy(QTreeWidgetItem.ChildIndicatorPolicy.ShowIndicator)
+        item.setText(SIZE_COLUMN, format_size(summary.total_size))
+        item.setTextAlignment(SIZE_COLUMN, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        self._update_summary_tooltip(item, summary)
+
+    def _update_summary_tooltip(self, item, summary):
+        shown = item.childCount()
+        item.setToolTip(SIZE_COLUMN, f"{summary.describe()}\nShowing {shown:,} of {shown + summary.remaining:,} entries")
+
+    def load_summary_page(self, item, count=SUMMARY_PAGE_SIZE):
+        """
+        Add the next children of a summarized directory as items.
+
+        Args:
+            item (TreeItem): The summarized directory.
+            count (int): The number of children to add.
+
+        Returns:
+            int: The number of children added.
+        """
+        summary = self.summaries.get(item.path)
+        if summary is None or not summary.remaining:
+            return 0
+        first = item.childCount()
+        page = summary.take_page(count)
+        self._populate_tree_from_scan(item, page)
+        self.update_children_inheritance(item, first)
+        self._update_summary_tooltip(item, summary)
+        self.schedule_visible_metadata()
+        return len(page)
+
+    def show_more_entries(self, item):
+        """Add the next page of a summarized directory and expand it."""
+        self.load_summary_page(item)
+        item.setExpanded(True)
+
+    def on_item_expanded(self, item):
+        """Show the first page of a summarized directory when it is expanded."""
+        if self.summaries and item.childCount() == 0:
+            self.load_summary_page(item)
+
+    def _load_visible_pages(self, items):
+        """Add the next page of summarized directories whose last shown child is visible."""
+        loaded = False
+        for item in items:
+            parent = item.parent()
+            if parent is None or parent.child(parent.childCount() - 1) is not item:
+                continue
+            if self.load_summary_page(parent):
+                loaded = True
+        return loaded
+
+    def remove_root(self, root_item):
+        """Remove a root and its descendants from the workspace."""
+        index = self.indexOfTopLevelItem(root_item)
+        if index < 0:
+            return
+        self.takeTopLevelItem(index)
+        self.node_count -= self._unindex_subtree(root_item)
+        self.annotations.discard_under(root_item.path)
+        prefix = os.path.join(root_item.path, '')
+        for path in [p for p in self.summaries if p == root_item.path or p.startswith(prefix)]:
+            del self.summaries[path]
+        # Items of the removed subtree must not be touched once their results arrive
+        for path in [p for p in self._metadata_pending if p == root_item.path or p.startswith(prefix)]:
+            del self._metadata_pending[path]
+        if self._sort_path is not None and (self._sort_path == root_item.path or self._sort_path.startswith(prefix)):
+            self._sort_generation += 1
+            self._sort_path = None
+        self.rootsChanged.emit()
+
+    def _index_child(self, parent_item, child_item):
+        """Make a child findable by its name under its parent."""
+        children = self.child_index.get(id(parent_item))
+        if children is None:
+            children = self.child_index[id(parent_item)] = {}
+        children[child_item.name] = child_item
+
+    def _unindex_subtree(self, item):
+        """Remove the child maps of an item and its descendants. Returns the number of items."""
+        count = 0
+        stack = [item]
+        while stack:
+            current = stack.pop()
+            count += 1
+            self.child_index.pop(id(current), None)
+            for i in range(current.childCount()):
+                stack.append(current.child(i))
+        return count
+
+    def root_items(self):
+        """Return the root items of the workspace, in display order."""
+        return [self.topLevelItem(i) for i in range(self.topLevelItemCount())]
+
+    def load_workspace_from_json(self, roots_json):
+        """Populate the tree widget with several roots from JSON data."""
+        self.clear()
+        for root_json in roots_json:
+            self.add_root_from_json(root_json)
+
+    def load_workspace_from_snapshot(self, snapshot):
+        """
+        Populate the tree widget from a binary Snapshot.
 
-    def load_tree_from_json(self, root_json):
-        """Recursively populate the tree widget from JSON data."""
+        Items are built straight from the snapshot's arrays, without a JSON
+        node per item. As with JSON, a summarized directory shows its children
+        up to the last annotated one and keeps the rest pending.
+        """
         self.clear()
+        names = snapshot.names
+        name_indices = snapshot.name_indices
+        parents = snapshot.parents
+        flags = snapshot.flags
+        summaries = snapshot.summaries
+        items = [None] * snapshot.node_count
+        roots = []
+        to_show = {}  # Summarized node index -> children still to show as items
+        pending = {}  # Node index -> scan nodes of its children, for nodes not shown as items
+
+        for index in range(snapshot.node_count):
+            parent = parents[index]
+            node_flags = flags[index]
+            text = names[name_indices[index]]
+            type_ = "Directory" if node_flags & FLAG_DIRECTORY else "File"
+
+            siblings = pending.get(parent)
+            if siblings is None and parent in to_show:
+                if to_show[parent]:
+                    to_show[parent] -= 1
+                else:
+                    siblings = pending[parent] = []
+            if siblings is not None:
+                children = None
+                if node_flags & FLAG_DIRECTORY:
+                    children = pending[index] = []
+                    if index in summaries:
+                        children = DirectorySummary.from_json(summaries[index], children)
+                name = '' if node_flags & FLAG_PLACEHOLDER else text
+                siblings.append((text, type_, name, children))
+                continue
+
+            item = TreeItem([text, type_])
+            filter_state, item.is_filter_direct, item.is_exclude_direct = snapshot.state(index)
+            if item.is_filter_direct or item.is_exclude_direct:
+                item.filter_state = filter_state
+            if parent < 0:
+                item.path = snapshot.paths[len(roots)]
+                self.addTopLevelItem(item)
+                roots.append(item)
+            else:
+                if not node_flags & FLAG_PLACEHOLDER:
+                    item.set_name(text)
+                items[parent].addChild(item)
+            self.node_count += 1
+            if parent >= 0 and item.name:
+                self._index_child(items[parent], item)
+            if index in snapshot.comments and item.path:
+                self.annotations.set(item.path, snapshot.comments[index])
+            items[index] = item
+            if index in summaries:
+                to_show[index] = summaries[index].get('shown', 0)
+
+        for index in to_show:
+            summary = DirectorySummary.from_json(summaries[index], pending.get(index, []))
+            self._set_summary(items[index], summary)
+        for root_item in roots:
+            root_item.setExpanded(True)
+            self.update_children_inheritance(root_item)
+            self.update_item_appearance(root_item)
+        self.schedule_visible_metadata()
+
+    def add_root_from_json(self, root_json):
+        """Add a root and its descendants from JSON data. Returns the new root item."""
         name = root_json.get('name', '')
         type_ = root_json.get('type', '').capitalize()
         comment = root_json.get('comment', '')
@@ -66,7 +289,6 @@ class TreeView(QTreeWidget):
         path = root_json.get('path', '')
 
         root_item = TreeItem([name, type_])
-        root_item.comment = comment
         root_item.path = path
         root_item.is_filter_direct = is_filter_direct
         root_item.is_exclude_direct = is_exclude_direct
@@ -75,13 +297,22 @@ class TreeView(QTreeWidget):
         else:
             root_item.filter_state = 'none'
         self.addTopLevelItem(root_item)
-        self._populate_tree_from_json_recursive(root_item, root_json)
+        self.node_count += 1
+        if path:
+            self.annotations.set(path, comment)
+        if 'summary' in root_json:
+            self._add_summary_from_json(root_item, root_json)
+        else:
+            self._populate_tree_from_json_recursive(root_item, root_json)
         root_item.setExpanded(True)
         # After loading, update inheritance and appearance
         self.update_children_inheritance(root_item)
         self.update_item_appearance(root_item)
+        self.schedule_visible_metadata()
+        return root_item
 
     def _populate_tree_from_json_recursive(self, parent_item, node_json):
+        first = parent_item.childCount()
         contents = node_json.get('contents', [])
         for child in contents:
             name = child.get('name', '')
@@ -90,10 +321,12 @@ class TreeView(QTreeWidget):
             filter_state = child.get('filter_state', 'none')
             is_filter_direct = child.get('is_filter_direct', False)
             is_exclude_direct = child.get('is_exclude_direct', False)
-            path = child.get('path', '')
             child_item = TreeItem([name, type_])
-            child_item.comment = comment
-            child_item.path = path
+            # Paths are derived from the parent chain; an explicit empty path marks
+            # a placeholder item. Full paths written by older versions are ignored.
+            is_placeholder = child.get('path', None) == ''
+            if not is_placeholder:
+                child_item.set_name(name)
             child_item.is_filter_direct = is_filter_direct
             child_item.is_exclude_direct = is_exclude_direct
             if child_item.is_filter_direct or child_item.is_exclude_direct:
@@ -101,36 +334,488 @@ class TreeView(QTreeWidget):
             else:
                 child_item.filter_state = 'none'
             parent_item.addChild(child_item)
+            self.node_count += 1
+            if not is_placeholder:
+                self._index_child(parent_item, child_item)
+                if comment:
+                    self.annotations.set(child_item.path, comment)
             if type_.lower() == "directory":
-                self._populate_tree_from_json_recursive(child_item, child)
+                if 'summary' in child:
+                    self._add_summary_from_json(child_item, child)
+                else:
+                    self._populate_tree_from_json_recursive(child_item, child)
         # After adding all children, update inheritance and appearance
-        self.update_children_inheritance(parent_item)
+        self.update_children_inheritance(parent_item, first)
+
+    def _add_summary_from_json(self, item, node_json):
+        """Restore a summarized directory, showing only the children that carry annotations."""
+        contents = node_json.get('contents', [])
+        # Children up to the last one with a comment or direct state are shown
+        # right away, so nothing set on them is hidden in the summary
+        shown = 0
+        for i, child in enumerate(contents):
+            if has_annotations(child):
+                shown = i + 1
+        self._populate_tree_from_json_recursive(item, {'contents': contents[:shown]})
+        nodes = _scan_nodes_from_json(contents[shown:])
+        self._set_summary(item, DirectorySummary.from_json(node_json['summary'], nodes))
 
     def build_tree_json(self, item):
-        """Recursively build the JSON representation of the tree."""
+        """
+        Recursively build the JSON representation of the tree.
+
+        Only the root stores its full path; other nodes are located by their
+        name under the parent, except placeholders which store an empty path.
+        Comments are only written for items that have one.
+        """
         node = {
             "name": item.text(0),
             "type": item.text(1).lower(),
-            "comment": getattr(item, 'comment', ''),
             "filter_state": getattr(item, 'filter_state', 'none'),
-            "path": getattr(item, 'path', ''),
             "is_filter_direct": getattr(item, 'is_filter_direct', False),
             "is_exclude_direct": getattr(item, 'is_exclude_direct', False)
         }
-        if item.childCount() > 0:
+        comment = self.annotations.get(item.path) if item.path else ""
+        if comment:
+            node["comment"] = comment
+        if item.parent() is None:
+            node["path"] = item.path
+        elif not item.name:
+            node["path"] = ""
+        summary = self.summaries.get(item.path) if self.summaries and item.path else None
+        if summary is not None:
+            node["summary"] = summary.to_json()
+        if item.childCount() > 0 or (summary is not None and summary.remaining):
             node["contents"] = []
             for i in range(item.childCount()):
                 child = item.child(i)
                 node["contents"].append(self.build_tree_json(child))
+            if summary is not None:
+                # Children not shown yet inherit the directory's state
+                for child in summary.nodes[summary.loaded:]:
+                    node["contents"].append(_scan_node_json(child, item.filter_state))
         return node
 
+    def clear(self):
+        """Clear the tree and drop any pending metadata requests."""
+        self._metadata_pending.clear()
+        self._sort_generation += 1
+        self._sort_path = None
+        self._diff_highlighted = False
+        self.node_count = 0
+        self.child_index = {}
+        self.annotations = AnnotationStore()
+        self.summaries = {}
+        self.undo_stack.clear()
+        self.header().setSortIndicatorShown(False)
+        super().clear()
+
+    def detach_roots(self):
+        """
+        Remove all root items from the view without deleting them.
+
+        Returns:
+            tuple: (list of root items, node count, child index, annotations,
+            summaries), or None if no tree is loaded. Pass it back to attach_roots to show the
+            tree again; the undo history is not kept.
+        """
+        if self.topLevelItemCount() == 0:
+            return None
+        if self._diff_highlighted:
+            self.clear_diff_highlight()
+        node_count = self.node_count
+        child_index = self.child_index
+        annotations = self.annotations
+        summaries = self.summaries
+        root_items = [self.takeTopLevelItem(0) for _ in range(self.topLevelItemCount())]
+        self.clear()
+        return root_items, node_count, child_index, annotations, summaries
+
+    def attach_roots(self, root_items, node_count, child_index, annotations, summaries):
+        """Show root items previously returned by detach_roots."""
+        self.clear()
+        self.addTopLevelItems(root_items)
+        self.node_count = node_count
+        self.child_index = child_index
+        self.annotations = annotations
+        self.summaries = summaries
+        for root_item in root_items:
+            root_item.setExpanded(True)
+        self.schedule_visible_metadata()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.schedule_visible_metadata()
+
+    def schedule_visible_metadata(self, *args):
+        """Request metadata for visible rows once scrolling or expanding settles."""
+        self._metadata_timer.start()
+
+    def _visible_items(self):
+        """Return the items in the viewport plus METADATA_PREFETCH_ROWS above and below."""
+        first = self.itemAt(0, 0)
+        if first is None:
+            return []
+        items = [first]
+        item = first
+        for _ in range(METADATA_PREFETCH_ROWS):
+            item = self.itemAbove(item)
+            if item is None:
+                break
+            items.append(item)
+
+        height = self.viewport().height()
+        item = first
+        extra = 0
+        while extra < METADATA_PREFETCH_ROWS:
+            item = self.itemBelow(item)
+            if item is None:
+                break
+            items.append(item)
+            if self.visualItemRect(item).top() > height:
+                extra += 1
+        return items
+
+    def request_visible_metadata(self):
+        """Submit metadata computation for visible rows that have none yet."""
+        items = self._visible_items()
+        if self.summaries and self._load_visible_pages(items):
+            # Scrolled to the end of a summarized directory; look again once the page is shown
+            self.schedule_visible_metadata()
+        paths = []
+        for item in items:
+            path = item.path
+            if not path or item.data(MODIFIED_COLUMN, Qt.ItemDataRole.UserRole) is not None:
+                continue
+            if path in self._metadata_pending:
+                continue
+            self._metadata_pending[path] = item
+            paths.append(path)
+
+        for i in range(0, len(paths), METADATA_BATCH_SIZE):
+            worker = FunctionWorker(get_metadata_batch, paths[i:i + METADATA_BATCH_SIZE], self.metadata_cache)
+            worker.signals.finished.connect(self.on_metadata_ready)
+            self.metadata_pool.start(worker)
+
+    def on_metadata_ready(self, results):
+        """Fill in the metadata columns of items whose metadata has been computed."""
+        for path, metadata in results:
+            item = self._metadata_pending.pop(path, None)
+            if item is not None and metadata is not None:
+                self.set_item_metadata(item, metadata)
+
+    def set_item_metadata(self, item, metadata):
+        """Display metadata on an item and keep the raw values for sorting."""
+        size = metadata.size
+        if size is None and self.summaries:
+            summary = self.summaries.get(item.path)
+            if summary is not None:
+                size = summary.total_size
+        item.setText(SIZE_COLUMN, format_size(size))
+        item.setText(MODIFIED_COLUMN, format_mtime(metadata.mtime))
+        item.setText(LINES_COLUMN, format_lines(metadata.lines))
+        item.setData(SIZE_COLUMN, Qt.ItemDataRole.UserRole, size)
+        item.setData(MODIFIED_COLUMN, Qt.ItemDataRole.UserRole, metadata.mtime)
+        item.setData(LINES_COLUMN, Qt.ItemDataRole.UserRole, metadata.lines)
+        for column in (SIZE_COLUMN, LINES_COLUMN):
+            item.setTextAlignment(column, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+
+    def on_header_clicked(self, column):
+        """Sort the current directory by a metadata column, computing it in the background."""
+        if column not in (SIZE_COLUMN, MODIFIED_COLUMN, LINES_COLUMN):
+            return
+        directory = self.currentItem() or self.topLevelItem(0)
+        if directory is None:
+            return
+        if directory.text(1).lower() != "directory" and directory.parent() is not None:
+            directory = directory.parent()
+        if not directory.path:
+            return
+
+        header = self.header()
+        if (header.isSortIndicatorShown() and header.sortIndicatorSection() == column
+                and header.sortIndicatorOrder() == Qt.SortOrder.AscendingOrder):
+            order = Qt.SortOrder.DescendingOrder
+        else:
+            order = Qt.SortOrder.AscendingOrder
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(column, order)
+
+        paths = [directory.child(i).path for i in range(directory.childCount())]
+        paths = [p for p in paths if p]
+        self._sort_generation += 1
+        self._sort_path = directory.path
+        # The directory travels as a path, so a result for a removed directory finds nothing
+        worker = FunctionWorker(
+            self._run_sort_metadata, self._sort_generation, directory.path, column, order, paths
+        )
+        worker.signals.finished.connect(self.on_sort_metadata_ready)
+        self.metadata_pool.start(worker)
+
+    def _run_sort_metadata(self, generation, directory_path, column, order, paths):
+        """Worker job: compute the metadata of a directory's children for a sort request."""
+        return generation, directory_path, column, order, get_metadata_batch(paths, self.metadata_cache)
+
+    def on_sort_metadata_ready(self, outcome):
+        """Apply the computed metadata and sort the target directory's children."""
+        generation, directory_path, column, order, results = outcome
+        if generation != self._sort_generation:
+            return
+        self._sort_path = None
+        directory = self.find_item_by_path(directory_path)
+        if directory is None:
+            return
+
+        metadata_by_path = dict(results)
+        for i in range(directory.childCount()):
+            child = directory.child(i)
+            metadata = metadata_by_path.get(child.path)
+            if metadata is not None:
+                self.set_item_metadata(child, metadata)
+                self._metadata_pending.pop(child.path, None)
+
+        def sort_key(child):
+            value = child.data(column, Qt.ItemDataRole.UserRole)
+            # Items without a value (directories for size/lines) always sort last
+            return (value is None, value if value is not None else 0)
+
+        expanded = {id(directory.child(i)): directory.child(i).isExpanded()
+                    for i in range(directory.childCount())}
+        children = directory.takeChildren()
+        children.sort(key=sort_key, reverse=(order == Qt.SortOrder.DescendingOrder))
+        if order == Qt.SortOrder.DescendingOrder:
+            # Keep items without a value at the end in both directions
+            children.sort(key=lambda c: c.data(column, Qt.ItemDataRole.UserRole) is None)
+        directory.addChildren(children)
+        for child in children:
+            if expanded.get(id(child)):
+                child.setExpanded(True)
+        self.schedule_visible_metadata()
+
+    def find_item_by_path(self, path):
+        """
+        Return the item with the given path, or None if it is not in the tree.
+
+        Relative paths are looked up under each root in turn. Items in
+        summarized directories are added to the tree as needed.
+        """
+        if not path:
+            return None
+        if os.path.isabs(path):
+            return self._lookup_path(os.path.normpath(path))
+        for root_item in self.root_items():
+            item = self._lookup_path(os.path.normpath(os.path.join(root_item.path, path)))
+            if item is not None:
+                return item
+        return None
+
+    def _lookup_path(self, path, load=True):
+        """
+        Walk the child index from the root containing an absolute path, one name at a time.
+
+        Args:
+            path (str): The normalized absolute path.
+            load (bool): Add items still pending in summarized directories as needed.
+        """
+        for root_item in self.root_items():
+            root_path = root_item.path
+            if path == root_path:
+                return root_item
+            prefix = os.path.join(root_path, '')
+            if not root_path or not path.startswith(prefix):
+                continue
+            item = root_item
+            for name in path[len(prefix):].split(os.sep):
+                children = self.child_index.get(id(item))
+                child = children.get(name) if children is not None else None
+                if child is None and load and self.summaries:
+                    # The item may not be shown yet by a summarized directory
+                    summary = self.summaries.get(item.path)
+                    index = summary.index_of(name) if summary is not None else -1
+                    if index >= 0:
+                        self.load_summary_page(item, index + 1)
+                        child = self.child_index.get(id(item), {}).get(name)
+                if child is None:
+                    break
+                item = child
+            else:
+                return item
+        return None
+
+    def reveal_path(self, path):
+        """
+        Expand the ancestors of the item with the given path, scroll to it and select it.
+
+        Returns:
+            TreeItem: The revealed item, or None if the path is not in the tree.
+        """
+        item = self.find_item_by_path(path)
+        if item is None:
+            return None
+        parent = item.parent()
+        while parent is not None:
+            parent.setExpanded(True)
+            parent = parent.parent()
+        self.setCurrentItem(item)
+        self.scrollToItem(item, QTreeWidget.ScrollHint.PositionAtCenter)
+        return item
+
+    def collect_file_paths(self, include_excluded=False, root_item=None, directories=None):
+        """
+        Return the paths of all files in the tree, optionally skipping excluded ones.
+
+        Args:
+            include_excluded (bool): Also return excluded files.
+            root_item (TreeItem): Only collect below this root; defaults to all roots.
+            directories (list): If given, the paths of the directories walked are appended to it.
+        """
+        paths = []
+        stack = [root_item] if root_item is not None else self.root_items()
+        while stack:
+            item = stack.pop()
+            if item.filter_state == 'exclude' and not include_excluded:
+                continue
+            if item.text(1).lower() == "file" and item.path:
+                paths.append(item.path)
+            elif item.path:
+                if directories is not None:
+                    directories.append(item.path)
+                if self.summaries and item.path in self.summaries:
+                    paths.extend(self.summaries[item.path].file_paths(item.path, directories))
+            for i in range(item.childCount()):
+                stack.append(item.child(i))
+        return paths
+
+    def collect_included_file_paths(self, directories=None):
+        """
+        Return the paths of the files the current command would include.
+
+        Excluded files are skipped; within a root where anything is filtered,
+        only filtered files count.
+
+        Args:
+            directories (list): If given, the paths of the included directories are appended to it.
+        """
+        paths = []
+        for root_item in self.root_items():
+            has_filters = False
+            stack = [root_item]
+            while stack and not has_filters:
+                item = stack.pop()
+                if item.is_filter_direct:
+                    has_filters = True
+                for i in range(item.childCount()):
+                    stack.append(item.child(i))
+            if not has_filters:
+                paths.extend(self.collect_file_paths(root_item=root_item, directories=directories))
+                continue
+            stack = [root_item]
+            while stack:
+                item = stack.pop()
+                if item.filter_state == 'exclude':
+                    continue
+                if item.filter_state == 'filter' and item.path:
+                    if item.text(1).lower() == "file":
+                        paths.append(item.path)
+                    else:
+                        if directories is not None:
+                            directories.append(item.path)
+                        if self.summaries and item.path in self.summaries:
+                            paths.extend(self.summaries[item.path].file_paths(item.path, directories))
+                for i in range(item.childCount()):
+                    stack.append(item.child(i))
+        return paths
+
+    def exclude_paths(self, paths):
+        """
+        Directly exclude several items at once, skipping those already excluded.
+
+        Returns:
+            int: The number of items newly excluded.
+        """
+        changes = []
+        for path in paths:
+            item = self.find_item_by_path(path)
+            if item is None or item.parent() is None or item.is_exclude_direct:
+                continue
+            if self.get_inherited_state(item) == 'exclude':
+                continue
+            changes.append((item.path, self.direct_state(item), 'exclude'))
+        if changes:
+            # One undo step for the whole batch
+            self.undo_stack.push(FilterStateCommand(self, changes, f"Exclude {len(changes)} items"))
+        return len(changes)
+
+    def highlight_diff(self, diff, workspace=False):
+        """
+        Highlight the differences reported by a TreeDiff in the current tree.
+
+        Added items are shown in green, changed items in orange. Removed items
+        are listed in the tooltip of their closest ancestor still in the tree.
+
+        Args:
+            diff (TreeDiff): The result of comparing a saved tree against this one.
+            workspace (bool): True if the diff was computed on workspace_json
+                nodes wrapping several roots, so paths start with the root name.
+        """
+        self.clear_diff_highlight()
+        if self.topLevelItemCount() == 0:
+            return
+        self._diff_highlighted = True
+
+        added = set(diff.added)
+        changed = {}  # Path -> names of its changed fields
+        for path, field, _, _ in diff.changed:
+            changed.setdefault(path, set()).add(field)
+        removed_by_parent = {}
+        for path in diff.removed:
+            parent_path = path.rsplit('/', 1)[0]
+            removed_by_parent.setdefault(parent_path, []).append(path)
+
+        if workspace:
+            stack = [(root_item, f"/{root_item.text(0)}") for root_item in self.root_items()]
+        else:
+            stack = [(self.topLevelItem(0), '')]
+        while stack:
+            item, path = stack.pop()
+            display_path = path or '/'
+            if path in added:
+                item.setForeground(0, Qt.GlobalColor.darkGreen)
+                item.setToolTip(1, "Added")
+            elif display_path in changed:
+                item.setForeground(0, QColor(255, 140, 0))
+                item.setToolTip(1, "Changed: " + ", ".join(sorted(changed[display_path])))
+            if path in removed_by_parent:
+                removed = removed_by_parent.pop(path)
+                tooltip = item.toolTip(1)
+                lines = [tooltip] if tooltip else []
+                lines.append("Removed:")
+                lines.extend(f"  {p.rsplit('/', 1)[-1]}" for p in removed)
+                item.setToolTip(1, "\n".join(lines))
+                if path not in added and display_path not in changed:
+                    item.setForeground(0, Qt.GlobalColor.gray)
+            for i in range(item.childCount()):
+                child = item.child(i)
+                stack.append((child, f"{path}/{child.text(0)}"))
+
+    def clear_diff_highlight(self):
+        """Remove any highlighting applied by highlight_diff."""
+        self._diff_highlighted = False
+        stack = self.root_items()
+        while stack:
+            item = stack.pop()
+            item.setData(0, Qt.ItemDataRole.ForegroundRole, None)
+            item.setToolTip(1, "")
+            for i in range(item.childCount()):
+                stack.append(item.child(i))
+
     def open_context_menu(self, position):
         """Open a context menu to filter, exclude, expand, or collapse items."""
         selected_item = self.itemAt(position)
         if selected_item:
             menu = QMenu()
             # Prevent filtering or excluding the root item
-            if selected_item != self.topLevelItem(0):
+            if selected_item.parent() is not None:
                 # Check if the item is a directory
                 if selected_item.text(1).lower() == "directory":
                     # Add recursive actions only for directories
@@ -154,10 +839,17 @@ class TreeView(QTreeWidget):
                 # Optionally, show disabled actions or a message
                 action = menu.addAction("Cannot filter or exclude the root directory")
                 action.setEnabled(False)
+                if self.topLevelItemCount() > 1:
+                    remove_root_action = menu.addAction("Remove Root from Workspace")
+                    remove_root_action.triggered.connect(lambda: self.remove_root(selected_item))
+            summary = self.summaries.get(selected_item.path) if selected_item.path else None
+            if summary is not None and summary.remaining:
+                more_action = menu.addAction(f"Show More Entries ({summary.remaining:,} not shown)")
+                more_action.triggered.connect(lambda: self.show_more_entries(selected_item))
             menu.exec(self.viewport().mapToGlobal(position))
 
     def set_item_state(self, item, state):
-        """Update item state and emit signal."""
+        """Update item state as an undoable step and emit signal."""
         # Check if setting filter/exclude on an item that is already inherited
         inherited_state = self.get_inherited_state(item)
         if state == 'filter':
@@ -177,6 +869,24 @@ class TreeView(QTreeWidget):
                 )
                 return
 
+        if not item.path:
+            # Placeholders cannot be looked up again, so they get no undo step
+            self._set_item_state(item, state)
+            self.itemStateChanged.emit()
+            return
+        old_state = self.direct_state(item)
+        if old_state == state:
+            return
+        change = (item.path, old_state, state)
+        self.undo_stack.push(FilterStateCommand(self, [change], f"Set {item.text(0)} to {state}"))
+
+    def apply_item_state(self, path, state):
+        """Set the direct state of the item at a path without validation; used by undo and redo."""
+        item = self._lookup_path(os.path.normpath(path), load=False) if path else None
+        if item is not None:
+            self._set_item_state(item, state)
+
+    def _set_item_state(self, item, state):
         # Update the item's filter_state and direct flags
         if state == 'filter':
             item.set_filter('filter', direct=True)
@@ -197,8 +907,24 @@ class TreeView(QTreeWidget):
         # Update item appearance
         self.update_item_appearance(item)
 
-        # Emit signal
-        self.itemStateChanged.emit()
+    def direct_state(self, item):
+        """Return the state set directly on an item: 'filter', 'exclude' or 'none'."""
+        if item.is_filter_direct:
+            return 'filter'
+        if item.is_exclude_direct:
+            return 'exclude'
+        return 'none'
+
+    def set_comment(self, path, comment):
+        """Change the comment of the item at a path as an undoable step."""
+        old_comment = self.annotations.get(path)
+        if comment != old_comment:
+            self.undo_stack.push(CommentCommand(self, path, old_comment, comment))
+
+    def apply_comment(self, path, comment):
+        """Store a comment without recording an undo step; used by undo and redo."""
+        self.annotations.set(path, comment)
+        self.commentChanged.emit(path)
 
     def get_inherited_state(self, item):
         """Determine the inherited filter state from ancestors."""
@@ -211,9 +937,9 @@ class TreeView(QTreeWidget):
             parent = parent.parent()
         return 'none'
 
-    def update_children_inheritance(self, parent_item):
-        """Update the inherited filter/exclude states for all children."""
-        for i in range(parent_item.childCount()):
+    def update_children_inheritance(self, parent_item, first=0):
+        """Update the inherited filter/exclude states for all children, or those from index first on."""
+        for i in range(first, parent_item.childCount()):
             child = parent_item.child(i)
             # If the child has a direct state, its children will inherit from it
             if child.is_filter_direct or child.is_exclude_direct:
@@ -275,3 +1001,39 @@ class TreeView(QTreeWidget):
             if child.text(1).lower() == "directory":
                 self.collapse_recursively(child)
         self.collapseItem(item)
+
+
+def _scan_nodes_from_json(contents):
+    """Convert JSON child nodes without annotations back into scan nodes."""
+    nodes = []
+    for child in contents:
+        text = child.get('name', '')
+        type_ = child.get('type', '').capitalize()
+        name = '' if child.get('path', None) == '' else text
+        children = None
+        if type_.lower() == "directory":
+            children = _scan_nodes_from_json(child.get('contents', []))
+            if 'summary' in child:
+                children = DirectorySummary.from_json(child['summary'], children)
+        nodes.append((text, type_, name, children))
+    return nodes
+
+
+def _scan_node_json(node, filter_state):
+    """Build the JSON of a scan node that is not shown as an item, in the format of build_tree_json."""
+    text, type_, name, children = node
+    node_json = {
+        "name": text,
+        "type": type_.lower(),
+        "filter_state": filter_state,
+        "is_filter_direct": False,
+        "is_exclude_direct": False
+    }
+    if not name:
+        node_json["path"] = ""
+    if isinstance(children, DirectorySummary):
+        node_json["summary"] = children.to_json()
+        children = children.nodes[children.loaded:]
+    if children:
+        node_json["contents"] = [_scan_node_json(child, filter_state) for child in children]
+    return node_json
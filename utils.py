@@ -1,3 +1,4 @@
+import os
 import re
 
 def make_safe_filename(s):
@@ -11,3 +12,19 @@ def make_safe_filename(s):
     s = re.sub(r'[^\w\s-]', '', s)
     s = s.strip().replace(' ', '_')
     return s
+
+def common_parent(paths):
+    """
+    Return the deepest directory that contains all the given paths.
+
+    Returns None when the paths only share a filesystem or drive root, or are
+    on different drives, since walking that parent would cover far more than
+    the paths themselves.
+    """
+    try:
+        parent = os.path.commonpath(paths)
+    except ValueError:
+        return None
+    if os.path.dirname(parent) == parent:
+        return None
+    return parent
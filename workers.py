@@ -0,0 +1,26 @@
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class WorkerSignals(QObject):
+    """Signals emitted by a FunctionWorker, delivered in the receiver's thread."""
+    finished = pyqtSignal(object)  # Return value of the function
+    error = pyqtSignal(str)
+
+
+class FunctionWorker(QRunnable):
+    """Run a function in a QThreadPool and report its result through signals."""
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.finished.emit(result)